@@ -0,0 +1,193 @@
+"""Throughput and latency of the read views served over WSGI and over ASGI.
+
+Drives main.wsgi and main.asgi in-process with the same number of concurrent
+clients. WSGI gets a fixed pool of worker threads, as gunicorn --threads would;
+ASGI runs the clients on one event loop and lets the views run their queries
+concurrently (READ_CONCURRENCY). --db-latency-ms adds a sleep to every query to
+approximate a database across the network; against a local SQLite file both
+deployments are bound by template rendering under the GIL and come out even:
+
+    python benchmarks/bench_asgi.py --clients 64 --threads 8 --db-latency-ms 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import migrate, percentiles, seed, setup_django  # noqa: E402
+
+
+def add_db_latency(seconds):
+    from django.db.backends.signals import connection_created
+
+    def sleep(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if sleep not in connection.execute_wrappers:
+            connection.execute_wrappers.append(sleep)
+
+    connection_created.connect(install, weak=False)
+
+
+def urls():
+    from django.urls import reverse
+    from webapp.models import Article, Comment
+
+    hot = Article.objects.order_by('-comment_count').first()
+    return [
+        reverse('index') + '?page={}'.format(Article.objects.count() // 8),
+        reverse('comment_index') + '?page={}'.format(Comment.objects.count() // 12),
+        reverse('article_view', kwargs={'pk': hot.pk}) + '?page={}'.format(hot.comment_count // 6),
+    ]
+
+
+def wsgi_get(application, url):
+    path, _, query = url.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost', 'wsgi.url_scheme': 'http', 'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr, 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+        'wsgi.run_once': False, 'wsgi.version': (1, 0),
+    }
+    status = []
+    body = b''.join(application(environ, lambda code, headers, exc_info=None: status.append(code)))
+    return int(status[0].split()[0]), len(body)
+
+
+async def asgi_get(application, url):
+    path, _, query = url.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'headers': [(b'host', b'localhost')], 'server': ('localhost', 80), 'client': None,
+    }
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    status = []
+    body = []
+
+    async def receive():
+        return messages.pop() if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        elif message['type'] == 'http.response.body':
+            body.append(message.get('body', b''))
+
+    await application(scope, receive, send)
+    return status[0], len(b''.join(body))
+
+
+def report(name, latencies, statuses, seconds):
+    return {
+        'deployment': name,
+        'requests': len(latencies),
+        'status': sorted(set(statuses)),
+        'rps': round(len(latencies) / seconds, 1),
+        'latency_ms': percentiles(latencies),
+    }
+
+
+def bench_wsgi(urls, clients, threads, requests):
+    from django.conf import settings
+    from main.wsgi import application
+
+    settings.READ_CONCURRENCY = 0
+    latencies = []
+    statuses = []
+
+    def client(index, queued):
+        status, _ = wsgi_get(application, urls[index % len(urls)])
+        latencies.append((time.perf_counter() - queued) * 1000)
+        statuses.append(status)
+
+    async def run():
+        # Each client waits for its response before sending the next request, and requests
+        # queue for a free worker thread as they would on a threaded WSGI server.
+        loop = asyncio.get_running_loop()
+        pending = iter(range(requests))
+
+        async def sequence():
+            for index in pending:
+                await loop.run_in_executor(pool, client, index, time.perf_counter())
+
+        await asyncio.gather(*[sequence() for _ in range(clients)])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        asyncio.run(run())
+    return report('wsgi ({} threads)'.format(threads), latencies, statuses, time.perf_counter() - started)
+
+
+def bench_asgi(urls, clients, concurrency, requests):
+    from django.conf import settings
+    from main.asgi import application
+
+    settings.READ_CONCURRENCY = concurrency
+    latencies = []
+    statuses = []
+    pending = iter(range(requests))
+
+    async def client():
+        for index in pending:
+            started = time.perf_counter()
+            status, _ = await asgi_get(application, urls[index % len(urls)])
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses.append(status)
+
+    async def run():
+        await asyncio.gather(*[client() for _ in range(clients)])
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    return report('asgi (READ_CONCURRENCY={})'.format(concurrency), latencies, statuses,
+                  time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=2000)
+    parser.add_argument('--comments', type=int, default=20000)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=8, help='WSGI worker threads')
+    parser.add_argument('--read-concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=600)
+    parser.add_argument('--db-latency-ms', type=float, default=0.0)
+    parser.add_argument('--json', help='Write the report to this file')
+    args = parser.parse_args()
+
+    setup_django()
+    migrate()
+    seed(articles=args.articles, comments=args.comments, seed=1)
+    if args.db_latency_ms:
+        add_db_latency(args.db_latency_ms / 1000)
+
+    # Cached article bodies would hide the query work being compared.
+    from django.conf import settings
+    settings.ARTICLE_PAGE_CACHE_TIMEOUT = 0
+
+    targets = urls()
+    results = [
+        bench_wsgi(targets, args.clients, args.threads, args.requests),
+        bench_asgi(targets, args.clients, args.read_concurrency, args.requests),
+    ]
+    for result in results:
+        print('{:<32} {:>6} req/s  p50 {:>8.2f} ms  p90 {:>8.2f} ms  p99 {:>8.2f} ms  status {}'.format(
+            result['deployment'], result['rps'], result['latency_ms']['p50'], result['latency_ms']['p90'],
+            result['latency_ms']['p99'], ','.join(map(str, result['status']))))
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'meta': vars(args), 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Query plans and timings of the hot list/detail queries with and without the 0005 indexes.
+
+Seeds a scratch SQLite database, runs EXPLAIN QUERY PLAN and times every query,
+then drops the indexes and repeats:
+
+    python benchmarks/bench_indexes.py --articles 20000 --comments 200000
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import migrate, percentiles, seed, setup_django, timed  # noqa: E402
+
+
+INDEXES = [
+    ('Article', 'article_created_idx'),
+    ('Comment', 'comment_article_created_idx'),
+    ('Comment', 'comment_created_idx'),
+]
+CONSTRAINTS = [
+    ('ArticleTag', 'articletag_tag_article_uniq'),
+]
+
+
+def hot_queries():
+    from webapp.models import Article, ArticleTag, Comment
+    busiest = Article.objects.order_by('-comment_count').values_list('pk', flat=True).first()
+    tag = ArticleTag.objects.values_list('tag_id', flat=True).first()
+    middle = Comment.objects.order_by('-created_at')[Comment.objects.count() // 2]
+    return {
+        'article index page': Article.objects.order_by('-created_at')[40:44],
+        'article comments page': Comment.objects.filter(article_id=busiest).order_by('-created_at')[:3],
+        'comment index page': Comment.objects.order_by('-created_at')[60:66],
+        'comment keyset page': Comment.objects.filter(created_at__lt=middle.created_at)
+                                              .order_by('-created_at', '-pk')[:6],
+        'articles by tag': ArticleTag.objects.filter(tag_id=tag).values_list('article_id', flat=True),
+    }
+
+
+def explain(queryset):
+    from django.db import connection
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def measure(repeat):
+    results = {}
+    for name, queryset in hot_queries().items():
+        results[name] = {
+            'plan': explain(queryset),
+            'ms': percentiles(timed(lambda: list(queryset.all()), repeat)),
+        }
+    return results
+
+
+def drop_indexes():
+    from django.apps import apps
+    from django.db import connection
+    from django.db.migrations.state import ProjectState
+    # SQLite drops a constraint by rebuilding the table from the model, so hand
+    # the schema editor a model state that no longer declares it.
+    state = ProjectState.from_apps(apps)
+    for model_name, name in CONSTRAINTS:
+        options = state.models['webapp', model_name.lower()].options
+        options['constraints'] = [c for c in options['constraints'] if c.name != name]
+    with connection.schema_editor() as editor:
+        for model_name, name in INDEXES:
+            model = apps.get_model('webapp', model_name)
+            editor.remove_index(model, next(index for index in model._meta.indexes if index.name == name))
+        for model_name, name in CONSTRAINTS:
+            model = apps.get_model('webapp', model_name)
+            constraint = next(c for c in model._meta.constraints if c.name == name)
+            editor.remove_constraint(state.apps.get_model('webapp', model_name), constraint)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=20000)
+    parser.add_argument('--comments', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--json', help='Write the results to this file')
+    args = parser.parse_args()
+
+    db_name = setup_django()
+    migrate()
+    seconds = seed(articles=args.articles, comments=args.comments, hot_share=0.2, seed=1)
+    print('Seeded {} articles and {} comments into {} in {:.1f}s'.format(
+        args.articles, args.comments, db_name, seconds))
+
+    report = {'indexed': measure(args.repeat)}
+    drop_indexes()
+    report['unindexed'] = measure(args.repeat)
+
+    for name in report['indexed']:
+        print('\n' + name)
+        for variant in ('unindexed', 'indexed'):
+            result = report[variant][name]
+            print('  {:<10} p50 {:>9.3f} ms  p90 {:>9.3f} ms'.format(variant, result['ms']['p50'], result['ms']['p90']))
+            for step in result['plan']:
+                print('  {:<10}   {}'.format('', step))
+
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Concurrent read/write throughput of the default and the production SQLite profiles.
+
+Each profile runs in its own process against a freshly seeded scratch database.
+Reader threads browse the article index, article pages and the comment list
+while writer threads post comments, for --seconds seconds. A response with any
+other status than expected counts as an error and fails the run:
+
+    python benchmarks/bench_sqlite.py --readers 8 --writers 2 --seconds 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import migrate, percentiles, seed, setup_django  # noqa: E402
+
+PROFILES = ['main.settings', 'main.settings_production']
+
+
+def worker(kind, urls, deadline, results):
+    from django.db import close_old_connections
+    from django.test import Client
+
+    client = Client()
+    latencies = []
+    errors = 0
+    index = 0
+    while time.perf_counter() < deadline:
+        method, url, data, status = urls[index % len(urls)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            response = getattr(client, method)(url, data)
+            if response.status_code != status:
+                errors += 1
+        except Exception:
+            errors += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+    close_old_connections()
+    results.append((kind, latencies, errors))
+
+
+def run_profile(args):
+    setup_django(settings_module=args.settings)
+    migrate()
+    seed(articles=args.articles, comments=args.comments, seed=1)
+
+    from django.conf import settings
+    from django.db import connections
+    from django.urls import reverse
+    from webapp.models import Article
+
+    # Measure the database, not the article page cache.
+    settings.ARTICLE_PAGE_CACHE_TIMEOUT = 0
+    connections.close_all()
+
+    pks = list(Article.objects.order_by('?').values_list('pk', flat=True)[:50])
+    reads = [('get', reverse('index'), {'page': 2}, 200), ('get', reverse('comment_index'), {'page': 3}, 200)]
+    reads += [('get', reverse('article_view', kwargs={'pk': pk}), None, 200) for pk in pks]
+    writes = [('post', reverse('article_comment_add', kwargs={'pk': pk}), {'text': 'Benchmark', 'author': 'Bench'},
+               302) for pk in pks]
+
+    results = []
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=worker, args=('read', reads, deadline, results))
+               for _ in range(args.readers)]
+    threads += [threading.Thread(target=worker, args=('write', writes, deadline, results))
+                for _ in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    report = {'settings': args.settings}
+    for kind in ('read', 'write'):
+        latencies = [value for name, samples, _ in results if name == kind for value in samples]
+        report[kind] = {
+            'requests': len(latencies),
+            'per_second': round(len(latencies) / args.seconds, 1),
+            'errors': sum(errors for name, _, errors in results if name == kind),
+            'latency_ms': percentiles(latencies) if latencies else None,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=2000)
+    parser.add_argument('--comments', type=int, default=20000)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--settings', help='Run a single profile in this process')
+    parser.add_argument('--json', help='Write the report to this file')
+    args = parser.parse_args()
+
+    if args.settings:
+        print(json.dumps(run_profile(args)))
+        return
+
+    reports = []
+    for profile in PROFILES:
+        command = [sys.executable, os.path.abspath(__file__), '--settings', profile]
+        for option in ('articles', 'comments', 'readers', 'writers', 'seconds'):
+            command += ['--' + option, str(getattr(args, option))]
+        output = subprocess.check_output(command, env=dict(os.environ, DJANGO_SETTINGS_MODULE=profile))
+        reports.append(json.loads(output.decode().strip().splitlines()[-1]))
+
+    for report in reports:
+        for kind in ('read', 'write'):
+            result = report[kind]
+            latency = result['latency_ms'] or {'p50': 0, 'p99': 0}
+            print('{:<26} {:<5} {:>8} req/s  p50 {:>8.2f} ms  p99 {:>8.2f} ms  errors {}'.format(
+                report['settings'], kind, result['per_second'], latency['p50'], latency['p99'], result['errors']))
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(reports, output, indent=2)
+    if any(report[kind]['errors'] for report in reports for kind in ('read', 'write')):
+        sys.exit('Some requests failed or got an unexpected status; the timings above are not comparable.')
+
+
+if __name__ == '__main__':
+    main()
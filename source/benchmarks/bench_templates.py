@@ -0,0 +1,137 @@
+"""Render time of the list and detail templates with large pages, per template loader setup.
+
+Builds the view contexts once from a seeded scratch database, then renders each
+template repeatedly with the default (uncached) loaders and with the production
+cached loader, so only template work is measured:
+
+    python benchmarks/bench_templates.py --page-size 100 --repeat 50
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import migrate, percentiles, seed, setup_django, timed  # noqa: E402
+
+LOADERS = ['django.template.loaders.filesystem.Loader', 'django.template.loaders.app_directories.Loader']
+
+
+def engines():
+    from django.conf import settings
+    from django.template.backends.django import DjangoTemplates
+
+    options = settings.TEMPLATES[0]['OPTIONS']
+    setups = {
+        'uncached': LOADERS,
+        'cached': [('django.template.loaders.cached.Loader', LOADERS)],
+    }
+    return {
+        name: DjangoTemplates({
+            'NAME': name, 'DIRS': [], 'APP_DIRS': False,
+            'OPTIONS': {'context_processors': options['context_processors'], 'debug': False, 'loaders': loaders},
+        })
+        for name, loaders in setups.items()
+    }
+
+
+def materialize(context):
+    """Evaluates querysets in the context so that rendering runs no queries."""
+    for key in ('object_list', 'articles', 'comments'):
+        if key in context and not isinstance(context[key], list):
+            context[key] = list(context[key])
+    page = context.get('page_obj')
+    if page is not None:
+        page.object_list = list(page.object_list)
+    return context
+
+
+def contexts(page_size):
+    from django.contrib.auth.models import AnonymousUser
+    from django.db.models import prefetch_related_objects
+    from django.template.loader import render_to_string
+    from django.test import RequestFactory
+    from django.urls import reverse
+    from webapp.forms import ArticleCommentForm
+    from webapp.models import Article
+    from webapp.views import ArticleIndexView, ArticleView, CommentIndexView
+
+    factory = RequestFactory()
+
+    def request(url):
+        request = factory.get(url)
+        request.user = AnonymousUser()
+        request.session = {}
+        return request
+
+    def list_context(view_class, url):
+        view = view_class(paginate_by=page_size)
+        view.setup(request(url))
+        if hasattr(view, 'get_search_form'):
+            view.form = view.get_search_form()
+            view.search_query = view.get_search_query()
+        view.object_list = view.get_queryset()
+        return view.request, materialize(view.get_context_data())
+
+    hot = Article.objects.order_by('-comment_count').first()
+    url = reverse('article_view', kwargs={'pk': hot.pk})
+    view = ArticleView(comments_per_page=page_size)
+    view.setup(request(url), pk=hot.pk)
+    view.object = view.get_object()
+    body_context = {'article': view.object, 'object': view.object, 'view': view, 'form': ArticleCommentForm()}
+    view.paginate_comments_to_context(view.object.comments.order_by('-created_at'), body_context)
+    materialize(body_context)
+    prefetch_related_objects([view.object], 'tags')
+    article_context = dict(body_context, article_body=render_to_string('article/article_body.html', body_context,
+                                                                       view.request))
+
+    index_request, index_context = list_context(ArticleIndexView, reverse('index'))
+    comments_request, comments_context = list_context(CommentIndexView, reverse('comment_index'))
+    return [
+        ('article/index.html', index_request, index_context),
+        ('article/article_body.html', view.request, body_context),
+        ('article/article.html', view.request, article_context),
+        ('comments/index.html', comments_request, comments_context),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=1000)
+    parser.add_argument('--comments', type=int, default=10000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--json', help='Write the report to this file')
+    args = parser.parse_args()
+
+    setup_django()
+    migrate()
+    seed(articles=args.articles, comments=args.comments, seed=1)
+
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    report = {}
+    targets = contexts(args.page_size)
+    for engine_name, engine in engines().items():
+        for template_name, request, context in targets:
+            def render():
+                return engine.get_template(template_name).render(context, request)
+
+            with CaptureQueriesContext(connection) as captured:
+                size = len(render())
+                samples = timed(render, args.repeat)
+            result = {'bytes': size, 'queries': len(captured.captured_queries) // (args.repeat + 1),
+                      'render_ms': percentiles(samples)}
+            report.setdefault(template_name, {})[engine_name] = result
+            print('{:<28} {:<9} p50 {:>8.2f} ms  p90 {:>8.2f} ms  max {:>8.2f} ms  {:>8} bytes  {} queries'.format(
+                template_name, engine_name, result['render_ms']['p50'], result['render_ms']['p90'],
+                result['render_ms']['max'], size, result['queries']))
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'meta': vars(args), 'templates': report}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""Latency percentiles and query counts for every route in main/urls.py.
+
+Seeds a scratch SQLite database, drives each route through the Django test
+client and writes a JSON report that can be diffed between releases:
+
+    python benchmarks/bench_urls.py --articles 5000 --comments 50000 --json bench_urls.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import SOURCE_DIR, migrate, percentiles, seed, setup_django  # noqa: E402
+
+
+class Scenario:
+    """One benchmarked request; request() is called per iteration and returns (method, url, data).
+
+    Any response status other than `status` marks the run as failed: a form error would
+    otherwise time the form re-render instead of the write.
+    """
+
+    def __init__(self, name, route, request, cold=False, status=200):
+        self.name = name
+        self.route = route
+        self.request = request
+        self.cold = cold
+        self.status = status
+
+
+def scenarios():
+    from django.urls import reverse
+    from webapp.models import Article, Comment, Tag
+    from webapp.pagination import NEXT, PREVIOUS, encode_cursor
+
+    hot = Article.objects.order_by('-comment_count').first()
+    article = Article.objects.order_by('-created_at').first()
+    deep_article = Article.objects.order_by('-created_at')[Article.objects.count() // 2]
+    deep_comment = Comment.objects.order_by('-created_at')[Comment.objects.count() // 2]
+    hot_comment = hot.comments.order_by('-created_at')[hot.comment_count // 2]
+    article_pages = Article.objects.count() // 4
+    comment_pages = Comment.objects.count() // 6
+    hot_pages = hot.comment_count // 3
+    top_tag = Tag.objects.order_by('-article_count').first()
+
+    def edit(model, pk, form, field):
+        edits = itertools.count()
+
+        def request():
+            # The edit forms reject posts without the version of the object they were loaded from,
+            # and a post that changes nothing writes nothing, so every edit changes field.
+            version = model.objects.values_list('updated_at', flat=True).get(pk=pk).isoformat()
+            url = reverse('{}_update'.format(model._meta.model_name), kwargs={'pk': pk})
+            return 'post', url, dict(form, version=version, **{field: '{} {}'.format(form[field], next(edits))})
+        return request
+
+    def victims(model, **fields):
+        def request():
+            obj = model.objects.create(**fields)
+            return 'post', reverse('{}_delete'.format(model._meta.model_name), kwargs={'pk': obj.pk}), None
+        return request
+
+    article_form = {'title': 'Benchmark article', 'text': 'Benchmark text', 'author': 'Bench'}
+    comment_form = {'article': article.pk, 'text': 'Benchmark comment', 'author': 'Bench'}
+    some_comment = Comment.objects.filter(article=article).first() or Comment.objects.first()
+
+    return [
+        Scenario('index', 'index', lambda: ('get', reverse('index'), None)),
+        Scenario('index deep page', 'index', lambda: ('get', reverse('index'), {'page': article_pages // 2})),
+        Scenario('index deep cursor', 'index',
+                 lambda: ('get', reverse('index'), {'cursor': encode_cursor(deep_article, NEXT)})),
+        Scenario('index search', 'index', lambda: ('get', reverse('index'), {'search': 'lorem ipsum'})),
+        Scenario('discussed', 'article_discussed', lambda: ('get', reverse('article_discussed'), None)),
+        Scenario('trending', 'article_trending', lambda: ('get', reverse('article_trending'), None)),
+        Scenario('article', 'article_view', lambda: ('get', reverse('article_view', kwargs={'pk': hot.pk}), None)),
+        Scenario('article deep comments (cold)', 'article_view',
+                 lambda: ('get', reverse('article_view', kwargs={'pk': hot.pk}), {'page': hot_pages // 2}),
+                 cold=True),
+        Scenario('article deep comments cursor (cold)', 'article_view',
+                 lambda: ('get', reverse('article_view', kwargs={'pk': hot.pk}),
+                          {'cursor': encode_cursor(hot_comment, NEXT)}),
+                 cold=True),
+        Scenario('comment index', 'comment_index', lambda: ('get', reverse('comment_index'), None)),
+        Scenario('comment index deep page', 'comment_index',
+                 lambda: ('get', reverse('comment_index'), {'page': comment_pages // 2})),
+        Scenario('comment index deep cursor', 'comment_index',
+                 lambda: ('get', reverse('comment_index'), {'cursor': encode_cursor(deep_comment, NEXT)})),
+        Scenario('article add form', 'article_add', lambda: ('get', reverse('article_add'), None)),
+        Scenario('article add', 'article_add', lambda: ('post', reverse('article_add'), article_form), status=302),
+        Scenario('article edit form', 'article_update',
+                 lambda: ('get', reverse('article_update', kwargs={'pk': article.pk}), None)),
+        Scenario('article edit', 'article_update',
+                 edit(Article, article.pk, article_form, 'title'), status=302),
+        Scenario('article delete form', 'article_delete',
+                 lambda: ('get', reverse('article_delete', kwargs={'pk': article.pk}), None)),
+        Scenario('article delete', 'article_delete', victims(Article, title='Victim', text='Victim'), status=302),
+        Scenario('comment add form', 'comment_add', lambda: ('get', reverse('comment_add'), None)),
+        Scenario('comment add', 'comment_add', lambda: ('post', reverse('comment_add'), comment_form), status=302),
+        Scenario('article comment add', 'article_comment_add',
+                 lambda: ('post', reverse('article_comment_add', kwargs={'pk': article.pk}), comment_form),
+                 status=302),
+        Scenario('comment edit form', 'comment_update',
+                 lambda: ('get', reverse('comment_update', kwargs={'pk': some_comment.pk}), None)),
+        Scenario('comment edit', 'comment_update', edit(Comment, some_comment.pk, comment_form, 'text'), status=302),
+        Scenario('comment delete', 'comment_delete', victims(Comment, article=article, text='Victim'), status=302),
+        Scenario('tag cloud', 'tag_index', lambda: ('get', reverse('tag_index'), None)),
+        Scenario('tag articles', 'tag_articles',
+                 lambda: ('get', reverse('tag_articles', kwargs={'pk': top_tag.pk}), None)),
+        Scenario('author articles', 'author_articles',
+                 lambda: ('get', reverse('author_articles', kwargs={'pk': article.author_id}), None)),
+        Scenario('archive', 'archive_index', lambda: ('get', reverse('archive_index'), None)),
+        Scenario('archive year', 'archive_year',
+                 lambda: ('get', reverse('archive_year', kwargs={'year': article.created_at.year}), None)),
+        Scenario('archive month', 'archive_month',
+                 lambda: ('get', reverse('archive_month', kwargs={'year': article.created_at.year,
+                                                                  'month': article.created_at.month}), None)),
+        Scenario('articles rss', 'article_feed_rss', lambda: ('get', reverse('article_feed_rss'), None)),
+        Scenario('articles atom', 'article_feed_atom', lambda: ('get', reverse('article_feed_atom'), None)),
+        Scenario('article comments rss', 'article_comments_feed_rss',
+                 lambda: ('get', reverse('article_comments_feed_rss', kwargs={'pk': hot.pk}), None)),
+        Scenario('article comments atom', 'article_comments_feed_atom',
+                 lambda: ('get', reverse('article_comments_feed_atom', kwargs={'pk': hot.pk}), None)),
+        Scenario('sitemap index (cold)', 'sitemap', lambda: ('get', reverse('sitemap'), None), cold=True),
+        Scenario('sitemap articles (cold)', 'sitemap_section',
+                 lambda: ('get', reverse('sitemap_section', kwargs={'section': 'articles'}), None), cold=True),
+        Scenario('api article list', 'api_article_list', lambda: ('get', reverse('api_article_list'), None)),
+        Scenario('api article detail', 'api_article_detail',
+                 lambda: ('get', reverse('api_article_detail', kwargs={'pk': hot.pk}), None)),
+        Scenario('api article comments', 'api_article_comments',
+                 lambda: ('get', reverse('api_article_comments', kwargs={'pk': hot.pk}), {'cursor': ''})),
+        Scenario('api comments since', 'api_comments_since',
+                 lambda: ('get', reverse('api_comments_since'),
+                          {'cursor': encode_cursor(Comment.objects.order_by('-created_at', '-id')[5], PREVIOUS)})),
+    ]
+
+
+def run(scenario, client, repeat):
+    import time
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    latencies = []
+    queries = []
+    statuses = set()
+    for _ in range(repeat):
+        method, url, data = scenario.request()
+        if scenario.cold:
+            cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured.captured_queries))
+        statuses.add(response.status_code)
+    return {
+        'route': scenario.route,
+        'url': url,
+        'status': sorted(statuses),
+        'expected_status': scenario.status,
+        'latency_ms': percentiles(latencies),
+        'queries': {'min': min(queries), 'max': max(queries)},
+    }
+
+
+def uncovered_routes(results):
+    from django.urls import get_resolver
+    names = {pattern.name for pattern in get_resolver().url_patterns if getattr(pattern, 'name', None)}
+    return sorted(names - {result['route'] for result in results.values()})
+
+
+def revision():
+    try:
+        return subprocess.check_output(['git', 'describe', '--always', '--dirty'], cwd=SOURCE_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=5000)
+    parser.add_argument('--comments', type=int, default=50000)
+    parser.add_argument('--hot-share', type=float, default=0.1)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--settings', default='main.settings')
+    parser.add_argument('--json', help='Write the report to this file')
+    args = parser.parse_args()
+
+    setup_django(settings_module=args.settings)
+    migrate()
+    seconds = seed(articles=args.articles, comments=args.comments, hot_share=args.hot_share, seed=1)
+
+    import django
+    from django.test import Client
+
+    client = Client()
+    results = {}
+    for scenario in scenarios():
+        results[scenario.name] = run(scenario, client, args.repeat)
+        result = results[scenario.name]
+        print('{:<38} {:>4} p50 {:>8.2f} ms  p90 {:>8.2f} ms  p99 {:>8.2f} ms  queries {:>3}-{:<3}'.format(
+            scenario.name, ','.join(map(str, result['status'])), result['latency_ms']['p50'],
+            result['latency_ms']['p90'], result['latency_ms']['p99'],
+            result['queries']['min'], result['queries']['max']))
+
+    missing = uncovered_routes(results)
+    if missing:
+        print('Routes without a scenario: {}'.format(', '.join(missing)))
+    failed = [name for name, result in results.items() if result['status'] != [result['expected_status']]]
+
+    report = {
+        'meta': {
+            'revision': revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'settings': args.settings,
+            'articles': args.articles,
+            'comments': args.comments,
+            'repeat': args.repeat,
+            'seed_seconds': round(seconds, 2),
+        },
+        'routes': results,
+    }
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(report, output, indent=2)
+    if failed:
+        sys.exit('Unexpected status in: {}'.format(', '.join(failed)))
+
+
+if __name__ == '__main__':
+    main()
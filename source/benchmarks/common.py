@@ -0,0 +1,74 @@
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+SOURCE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django(db_name=None, settings_module='main.settings'):
+    """Configure Django against a scratch SQLite file so benchmarks never touch db.sqlite3."""
+    if SOURCE_DIR not in sys.path:
+        sys.path.insert(0, SOURCE_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    if db_name is None:
+        db_name = os.path.join(tempfile.mkdtemp(prefix='webapp-bench-'), 'bench.sqlite3')
+    import django
+    from django.conf import settings
+    for alias in settings.DATABASES.values():
+        alias['NAME'] = db_name
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['testserver', 'localhost']
+    settings.STATIC_ROOT = tempfile.mkdtemp(prefix='webapp-bench-static-')
+    if settings.CACHES['default']['BACKEND'].endswith('FileBasedCache'):
+        settings.CACHES['default']['LOCATION'] = tempfile.mkdtemp(prefix='webapp-bench-cache-')
+    django.setup()
+    collect_static()
+    return db_name
+
+
+def collect_static():
+    """Manifest storages fail every page until collectstatic has written their manifest."""
+    from django.conf import settings
+    from django.contrib.staticfiles.storage import ManifestFilesMixin
+    from django.core.files.storage import get_storage_class
+    from django.core.management import call_command
+    if issubclass(get_storage_class(settings.STATICFILES_STORAGE), ManifestFilesMixin):
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+
+def migrate():
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def seed(**options):
+    from webapp.seeding import Seeder
+    started = time.perf_counter()
+    Seeder(**options).run()
+    return time.perf_counter() - started
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(fraction):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+
+    return {
+        'min': round(ordered[0], 3),
+        'p50': round(statistics.median(ordered), 3),
+        'p90': pick(0.9),
+        'p99': pick(0.99),
+        'max': round(ordered[-1], 3),
+    }
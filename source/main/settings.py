@@ -37,11 +37,13 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.sitemaps',
     'widget_tweaks',
     'webapp',
 ]
 
 MIDDLEWARE = [
+    'webapp.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,6 +84,11 @@ DATABASES = {
     }
 }
 
+# PRAGMA statements run on every new SQLite connection, per database alias.
+# See main/settings_production.py.
+
+SQLITE_PRAGMAS = {}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -120,3 +127,99 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/2.2/howto/static-files/
 
 STATIC_URL = '/static/'
+
+STATIC_ROOT = os.path.join(BASE_DIR, 'static_root')
+
+
+# Article search
+# Dotted path to a webapp.search backend; picked from the database vendor when empty.
+
+SEARCH_BACKEND = None
+
+
+# Pagination
+# 'page' renders numbered pages; 'cursor' switches list views to keyset pagination
+# with Next/Prev links only. A ?cursor= parameter selects cursor mode per request.
+
+PAGINATION_MODE = 'page'
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+# Article pages are invalidated through webapp.signals. Article versions and change times
+# also back the page and feed caches and the ETag/Last-Modified validators, so every process
+# must share one cache; main/settings_production.py switches to a file-based cache.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'webapp',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+ARTICLE_PAGE_CACHE_TIMEOUT = 600
+
+# The newest COMMENT_FEED_SIZE comments are kept in each process for COMMENT_FEED_TIMEOUT
+# seconds to answer the comment feed's polling endpoint.
+
+COMMENT_FEED_SIZE = 200
+COMMENT_FEED_TIMEOUT = 2
+
+
+# Feeds and sitemap
+# RSS/Atom feeds list the newest FEED_SIZE articles or comments. Feed and sitemap bodies are
+# cached under the article versions bumped by webapp.signals, so saves replace them early.
+
+FEED_SIZE = 20
+FEED_CACHE_TIMEOUT = 3600
+
+
+# Request profiling
+# webapp.middleware.ProfilingMiddleware is a no-op unless ENABLED. Per-view stats are served
+# as JSON at STATS_PATH; PROFILE_SAMPLE_RATE of requests run under cProfile and those slower
+# than SLOW_REQUEST_MS are dumped to PROFILE_DIR. The stats and the Server-Timing header are
+# only shown to staff users and to INTERNAL_IPS.
+
+PROFILING = {
+    'ENABLED': os.environ.get('DJANGO_PROFILING') == '1',
+    'STATS_PATH': '/__profiling__/',
+    'SLOW_REQUEST_MS': 500,
+    'PROFILE_SAMPLE_RATE': 0.0,
+    'PROFILE_DIR': os.path.join(BASE_DIR, 'profiles'),
+}
+
+
+# Concurrent reads
+# Number of threads the list and detail views use to run their independent queries
+# (page rows, total count, article tags) side by side; 0 runs them one after another.
+# main/asgi.py turns it on. Each thread holds its own database connection.
+
+READ_CONCURRENCY = int(os.environ.get('DJANGO_READ_CONCURRENCY', 0))
+
+
+# Comment write buffer
+# When ENABLED, comments posted on an article page are validated right away and written by
+# a background thread with bulk_create(), BATCH_SIZE at a time or every FLUSH_INTERVAL
+# seconds; the rest is flushed at exit. The author's next view of the article flushes first.
+
+COMMENT_WRITE_BUFFER = {
+    'ENABLED': os.environ.get('DJANGO_COMMENT_BUFFER') == '1',
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 0.5,
+}
+
+
+# Article view counter
+# When ENABLED, article page views are counted in memory and added to Article.view_count and
+# Article.trending_score every FLUSH_INTERVAL seconds. A view's weight in the trending score
+# halves every HALF_LIFE seconds; changing HALF_LIFE skews scores already stored.
+# main/settings_production.py turns it on; DJANGO_VIEW_COUNTER=0 turns it off there.
+
+ARTICLE_VIEW_BUFFER = {
+    'ENABLED': os.environ.get('DJANGO_VIEW_COUNTER') == '1',
+    'FLUSH_INTERVAL': 10,
+    'HALF_LIFE': 24 * 60 * 60,
+}
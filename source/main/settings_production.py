@@ -0,0 +1,102 @@
+"""
+Production settings for main project.
+
+    DJANGO_SETTINGS_MODULE=main.settings_production DJANGO_ALLOWED_HOSTS=example.com gunicorn main.wsgi
+
+Tunes SQLite for many concurrent readers and a single writer: WAL journal,
+persistent connections and a separate read-only connection that the article
+and comment list/detail views read from (webapp.routers.ReadOnlyRouter).
+"""
+
+from main.settings import *  # noqa: F401,F403
+from main.settings import ARTICLE_VIEW_BUFFER, BASE_DIR, DATABASES, MIDDLEWARE, TEMPLATES, os
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)  # noqa: F405
+
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost').split(',')
+
+
+# Templates
+# Templates are compiled once per process and kept by the cached loader, spelled out so it
+# stays on whatever DEBUG says; main/wsgi.py and main/asgi.py compile all of them at startup.
+# Restart the process after deploying templates.
+
+TEMPLATES = [
+    dict(TEMPLATES[0], APP_DIRS=False, OPTIONS=dict(
+        TEMPLATES[0]['OPTIONS'],
+        debug=False,
+        loaders=[
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    )),
+]
+
+
+# Cache
+# Shared by every worker process, which the article versions behind the page cache, the feed
+# cache and the ETag/Last-Modified validators need: with a per-process cache, workers that did
+# not see an edit keep answering 304s and serving the old pages. DJANGO_CACHE_DIR must be the
+# same directory for all workers; swap in memcached or Redis to share it between hosts.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('DJANGO_CACHE_DIR', os.path.join(BASE_DIR, 'cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    }
+}
+
+
+# Database
+# Connections are kept open for CONN_MAX_AGE seconds. 'readonly' opens the same file and
+# refuses writes (query_only); under WAL its readers never wait for the writer.
+
+DATABASES = {
+    'default': dict(DATABASES['default'], CONN_MAX_AGE=600, OPTIONS={'timeout': 5}),
+    'readonly': dict(DATABASES['default'], CONN_MAX_AGE=600, TEST={'MIRROR': 'default'}),
+}
+
+DATABASE_ROUTERS = ['webapp.routers.ReadOnlyRouter']
+
+SQLITE_PRAGMAS = {
+    'default': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,
+        'mmap_size': 268435456,
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    },
+    'readonly': {
+        'query_only': 'ON',
+        'cache_size': -64000,
+        'mmap_size': 268435456,
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    },
+}
+
+
+# Article view counter
+# Views are counted under every server that loads these settings, see ARTICLE_VIEW_BUFFER
+# in main/settings.py.
+
+ARTICLE_VIEW_BUFFER = dict(ARTICLE_VIEW_BUFFER, ENABLED=os.environ.get('DJANGO_VIEW_COUNTER', '1') == '1')
+
+
+# Static files
+# collectstatic minifies, fingerprints and pre-compresses the assets in STATIC_ROOT;
+# StaticFilesMiddleware serves them with far-future cache headers.
+
+STATICFILES_STORAGE = 'webapp.storage.CompressedManifestStaticFilesStorage'
+
+MIDDLEWARE = MIDDLEWARE[:1] + ['webapp.middleware.StaticFilesMiddleware'] + MIDDLEWARE[1:]
+
+STATIC_MAX_AGE = 60
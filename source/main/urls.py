@@ -15,14 +15,20 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
-from webapp.views import ArticleIndexView, ArticleView, ArticleCreateView, ArticleEditView, ArticleDeleteView,\
+from webapp.views import ArticleIndexView, DiscussedArticleIndexView, TrendingArticleIndexView, ArticleView, ArticleCreateView, ArticleEditView, ArticleDeleteView,\
                         CommentIndexView, CommentCreateView, CommentEditView, CommentDeleteView,\
-                        CommentForArticleCreateView
+                        CommentForArticleCreateView, TagIndexView, TagArticlesView, ArchiveIndexView, ArchiveArticlesView,\
+                        AuthorArticlesView,\
+                        LatestArticlesFeed, LatestArticlesAtomFeed, ArticleCommentsFeed, ArticleCommentsAtomFeed,\
+                        SitemapIndexView, SitemapView,\
+                        ArticleListApiView, ArticleDetailApiView, ArticleCommentsApiView, CommentsSinceApiView
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', ArticleIndexView.as_view(), name='index'),
+    path('discussed/', DiscussedArticleIndexView.as_view(), name='article_discussed'),
+    path('trending/', TrendingArticleIndexView.as_view(), name='article_trending'),
     path('article/<int:pk>/', ArticleView.as_view(), name='article_view'),
     path('article/add/', ArticleCreateView.as_view(), name='article_add'),
     path('article/<int:pk>/edit/', ArticleEditView.as_view(), name='article_update'),
@@ -31,5 +37,21 @@ urlpatterns = [
     path('comment/add/', CommentCreateView.as_view(), name='comment_add'),
     path('comment/<int:pk>/edit/', CommentEditView.as_view(), name='comment_update'),
     path('comment/<int:pk>/delete/', CommentDeleteView.as_view(), name='comment_delete'),
-    path('article/<int:pk>/add-comment/', CommentForArticleCreateView.as_view(), name='article_comment_add')
+    path('article/<int:pk>/add-comment/', CommentForArticleCreateView.as_view(), name='article_comment_add'),
+    path('tags/', TagIndexView.as_view(), name='tag_index'),
+    path('tags/<int:pk>/', TagArticlesView.as_view(), name='tag_articles'),
+    path('authors/<int:pk>/', AuthorArticlesView.as_view(), name='author_articles'),
+    path('archive/', ArchiveIndexView.as_view(), name='archive_index'),
+    path('archive/<int:year>/', ArchiveArticlesView.as_view(), name='archive_year'),
+    path('archive/<int:year>/<int:month>/', ArchiveArticlesView.as_view(), name='archive_month'),
+    path('feeds/articles/rss/', LatestArticlesFeed(), name='article_feed_rss'),
+    path('feeds/articles/atom/', LatestArticlesAtomFeed(), name='article_feed_atom'),
+    path('article/<int:pk>/comments/rss/', ArticleCommentsFeed(), name='article_comments_feed_rss'),
+    path('article/<int:pk>/comments/atom/', ArticleCommentsAtomFeed(), name='article_comments_feed_atom'),
+    path('sitemap.xml', SitemapIndexView.as_view(), name='sitemap'),
+    path('sitemap-<section>.xml', SitemapView.as_view(), name='sitemap_section'),
+    path('api/articles/', ArticleListApiView.as_view(), name='api_article_list'),
+    path('api/articles/<int:pk>/', ArticleDetailApiView.as_view(), name='api_article_detail'),
+    path('api/articles/<int:pk>/comments/', ArticleCommentsApiView.as_view(), name='api_article_comments'),
+    path('api/comments/since/', CommentsSinceApiView.as_view(), name='api_comments_since'),
   ]
@@ -1,24 +1,191 @@
-from django.contrib import admin
-from webapp.models import Article, Comment, Category
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
+from django.contrib.admin import helpers
+from django.forms.models import BaseInlineFormSet
+from django.template.response import TemplateResponse
+from webapp import moderation
+from webapp.models import Article, Author, Comment, Category, Tag, ArticleTag
 
 
-class CommentAdmin(admin.TabularInline):
+class LatestCommentsFormSet(BaseInlineFormSet):
+    """Inline formset showing one page of an article's comments, newest first.
+
+    A submitted page is bound to the comments it was rendered with rather than to its offset,
+    so comments added or deleted in the meantime cannot shift edits onto other rows.
+    """
+    per_page = 20
+    page = 1
+
+    def get_queryset(self):
+        if not hasattr(self, '_paged_queryset'):
+            queryset = super().get_queryset().order_by('-created_at', '-id')
+            self.total = queryset.count()
+            self.pages = max(1, (self.total + self.per_page - 1) // self.per_page)
+            self.page = min(max(self.page, 1), self.pages)
+            if self.is_bound:
+                self._paged_queryset = queryset.filter(pk__in=self.submitted_pks())
+            else:
+                offset = (self.page - 1) * self.per_page
+                self._paged_queryset = queryset[offset:offset + self.per_page]
+        return self._paged_queryset
+
+    def submitted_pks(self):
+        pk_name = self.model._meta.pk.name
+        pks = (self.data.get('{}-{}'.format(self.add_prefix(i), pk_name), '') for i in range(self.initial_form_count()))
+        return [int(pk) for pk in pks if pk.isdigit()]
+
+
+class CommentInline(admin.TabularInline):
     model = Comment
-    fields = ['author', 'text']
+    formset = LatestCommentsFormSet
+    fields = ['author', 'text', 'created_at']
+    readonly_fields = ['created_at']
+    autocomplete_fields = ['author']
+    template = 'admin/webapp/comment_inline.html'
+    page_param = 'comments_page'
+    extra = 0
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        try:
+            formset.page = int(request.GET.get(self.page_param, 1))
+        except ValueError:
+            formset.page = 1
+        formset.page_param = self.page_param
+        return formset
+
+
+class ArticleTagAdmin(admin.TabularInline):
+    model = ArticleTag
+    fields = ['tag']
+    raw_id_fields = ['tag']
     extra = 0
 
 
-class ArticleAdmin(admin.ModelAdmin):
-    list_display = ['pk', 'title', 'author', 'created_at']
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['pk', 'name', 'article_count', 'created_at']
+    search_fields = ['name']
+    readonly_fields = ['article_count', 'created_at']
+
+
+class AuthorAdmin(admin.ModelAdmin):
+    list_display = ['pk', 'name']
+    search_fields = ['name']
+    ordering = ['name']
+
+
+class BulkDeleteMixin:
+    """Replaces the admin's delete_selected, which loads every related row, with a set-based delete."""
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def confirm_bulk_delete(self, request, queryset, action, summary):
+        if request.POST.get('post') == 'yes':
+            return None
+        return TemplateResponse(request, 'admin/webapp/bulk_delete_confirmation.html', dict(
+            self.admin_site.each_context(request),
+            title='Are you sure?',
+            opts=self.model._meta,
+            action=action,
+            summary=summary,
+            selected=request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            select_across=request.POST.get('select_across', '0'),
+            action_checkbox_name=helpers.ACTION_CHECKBOX_NAME,
+        ))
+
+
+class ArticleActionForm(helpers.ActionForm):
+    category = forms.ModelChoiceField(Category.objects.all(), required=False, label='Category')
+    tag = forms.ModelChoiceField(Tag.objects.order_by('name'), required=False, label='Tag')
+
+
+class ArticleAdmin(BulkDeleteMixin, admin.ModelAdmin):
+    list_display = ['pk', 'title', 'author', 'category', 'comment_count', 'created_at']
+    list_select_related = ['author', 'category']
     list_filter = ['author', 'category']
+    autocomplete_fields = ['author']
     list_display_links = ['pk', 'title']
     search_fields = ['title', 'text']
     exclude = []
+    readonly_fields = ['created_at', 'updated_at', 'comment_count', 'last_commented_at']
+    inlines = [ArticleTagAdmin, CommentInline]
+    action_form = ArticleActionForm
+    actions = ['delete_articles', 'set_category', 'add_tag', 'remove_tag']
+    show_full_result_count = False
+
+    def action_choice(self, request, field):
+        try:
+            value = self.action_form.base_fields[field].clean(request.POST.get(field))
+        except ValidationError:
+            value = None
+        if value is None:
+            self.message_user(request, 'Choose a {} for this action.'.format(field), messages.WARNING)
+        return value
+
+    def delete_articles(self, request, queryset):
+        summary = '{} articles with their {} comments'.format(
+            queryset.count(), Comment.objects.filter(article__in=queryset).count())
+        confirmation = self.confirm_bulk_delete(request, queryset, 'delete_articles', summary)
+        if confirmation is not None:
+            return confirmation
+        deleted = moderation.delete_articles(queryset)
+        self.message_user(request, 'Deleted {} articles with their comments.'.format(deleted))
+    delete_articles.short_description = 'Delete selected articles'
+    delete_articles.allowed_permissions = ['delete']
+
+    def set_category(self, request, queryset):
+        category = self.action_choice(request, 'category')
+        if category is not None:
+            updated = moderation.set_category(queryset, category)
+            self.message_user(request, 'Moved {} articles to {}.'.format(updated, category))
+    set_category.short_description = 'Move selected articles to the chosen category'
+    set_category.allowed_permissions = ['change']
+
+    def add_tag(self, request, queryset):
+        tag = self.action_choice(request, 'tag')
+        if tag is not None:
+            tagged = moderation.add_tag(queryset, tag)
+            self.message_user(request, 'Tagged {} articles with {}.'.format(tagged, tag))
+    add_tag.short_description = 'Add the chosen tag to selected articles'
+    add_tag.allowed_permissions = ['change']
+
+    def remove_tag(self, request, queryset):
+        tag = self.action_choice(request, 'tag')
+        if tag is not None:
+            untagged = moderation.remove_tag(queryset, tag)
+            self.message_user(request, 'Removed {} from {} articles.'.format(tag, untagged))
+    remove_tag.short_description = 'Remove the chosen tag from selected articles'
+    remove_tag.allowed_permissions = ['change']
+
+
+class CommentAdmin(BulkDeleteMixin, admin.ModelAdmin):
+    list_display = ['pk', 'article', 'author', 'created_at']
+    list_select_related = ['article', 'author']
+    list_display_links = ['pk']
+    search_fields = ['text', 'author__name']
+    raw_id_fields = ['article']
+    autocomplete_fields = ['author']
     readonly_fields = ['created_at', 'updated_at']
-    inlines = [CommentAdmin]
+    actions = ['delete_comments']
+    show_full_result_count = False
+
+    def delete_comments(self, request, queryset):
+        confirmation = self.confirm_bulk_delete(request, queryset, 'delete_comments',
+                                                '{} comments'.format(queryset.count()))
+        if confirmation is not None:
+            return confirmation
+        deleted = moderation.delete_comments(queryset)
+        self.message_user(request, 'Deleted {} comments.'.format(deleted))
+    delete_comments.short_description = 'Delete selected comments'
+    delete_comments.allowed_permissions = ['delete']
 
 
 admin.site.register(Article, ArticleAdmin)
-admin.site.register(Comment)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Author, AuthorAdmin)
 admin.site.register(Category)
-
+admin.site.register(Tag, TagAdmin)
@@ -0,0 +1,63 @@
+from datetime import date, datetime
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from webapp.models import Article, ArticleMonth
+
+
+# Monthly article counts behind the archive pages, kept in ArticleMonth so listing the months
+# never groups the article table. Months are calendar months in the current time zone.
+
+ARCHIVE_MONTHS_KEY = 'archive:months'
+
+
+def month_of(value):
+    value = timezone.localtime(value)
+    return date(value.year, value.month, 1)
+
+
+def month_bounds(month):
+    """The [start, end) datetimes of the month starting on the given date."""
+    following = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return (timezone.make_aware(datetime(month.year, month.month, 1)),
+            timezone.make_aware(datetime(following.year, following.month, 1)))
+
+
+def year_bounds(year):
+    return timezone.make_aware(datetime(year, 1, 1)), timezone.make_aware(datetime(year + 1, 1, 1))
+
+
+def refresh_months(months):
+    """Recounts the given months with one range COUNT each over the created_at index."""
+    months = set(months)
+    with transaction.atomic():
+        for month in months:
+            start, end = month_bounds(month)
+            count = Article.objects.filter(created_at__gte=start, created_at__lt=end).count()
+            if count:
+                ArticleMonth.objects.update_or_create(month=month, defaults={'article_count': count})
+            else:
+                ArticleMonth.objects.filter(month=month).delete()
+    if months:
+        cache.delete(ARCHIVE_MONTHS_KEY)
+
+
+def rebuild_archive():
+    """Recounts every month in one pass over the article table, for after bulk imports."""
+    counts = Article.objects.annotate(month=TruncMonth('created_at')).order_by()\
+        .values('month').annotate(count=Count('pk')).values_list('month', 'count')
+    with transaction.atomic():
+        ArticleMonth.objects.all().delete()
+        ArticleMonth.objects.bulk_create([ArticleMonth(month=month_of(month), article_count=count)
+                                          for month, count in counts])
+    cache.delete(ARCHIVE_MONTHS_KEY)
+
+
+def get_archive_months():
+    """(month, article_count) pairs of every month with articles, newest first, cached until they change."""
+    return cache.get_or_set(ARCHIVE_MONTHS_KEY, lambda: list(
+        ArticleMonth.objects.filter(article_count__gt=0).order_by('-month').values_list('month', 'article_count')
+    ), None)
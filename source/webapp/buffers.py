@@ -0,0 +1,232 @@
+import atexit
+import logging
+import math
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, close_old_connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+from webapp.cache import bump_article_versions, latest_comments
+from webapp.models import Article, Comment
+from webapp.utils import chunks
+
+
+logger = logging.getLogger(__name__)
+
+PENDING_SESSION_KEY = 'pending_comment_articles'
+
+# Trending scores are stored as log(sum of views * 2 ** (age of the epoch at the view / half-life)),
+# so every view weighs twice as much as one a half-life older and comparing stored scores
+# compares time-decayed popularity without ever rewriting old rows.
+TRENDING_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+class BackgroundBuffer:
+    """Runs flush() on a daemon thread every flush_interval seconds, started by the first add()."""
+
+    thread_name = 'buffer'
+
+    def __init__(self, flush_interval):
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopped = False
+        self.thread = None
+
+    def start(self):
+        """Starts the flush thread; called with self.lock held."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name=self.thread_name, daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while not self.stopped:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # flush() keeps what it can retry; anything else is dropped rather than stopping the thread.
+                logger.exception('%s flush failed', self.thread_name)
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        raise NotImplementedError
+
+    def close(self):
+        self.stopped = True
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush()
+
+
+class CommentWriteBuffer(BackgroundBuffer):
+    """Collects validated comments and writes them with bulk_create(), one transaction per batch.
+
+    A background thread flushes every flush_interval seconds, or as soon as batch_size comments
+    are waiting; whatever is left is flushed when the process exits. bulk_create() skips the
+    Comment signals, so each batch refreshes the article counters and page cache itself.
+    Comments get their created_at when they are written, at most flush_interval late.
+    """
+
+    thread_name = 'comment-write-buffer'
+
+    def __init__(self, batch_size=100, flush_interval=0.5):
+        super().__init__(flush_interval)
+        self.batch_size = batch_size
+        self.pending = []
+
+    def add(self, comment):
+        with self.lock:
+            self.pending.append(comment)
+            full = len(self.pending) >= self.batch_size
+            self.start()
+        if full:
+            self.wakeup.set()
+
+    def flush(self):
+        with self.flush_lock:
+            while True:
+                with self.lock:
+                    batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+                if not batch:
+                    return
+                try:
+                    self.write(batch)
+                except DatabaseError:
+                    logger.exception('Could not write %d buffered comments, retrying later', len(batch))
+                    with self.lock:
+                        self.pending[:0] = batch
+                    return
+
+    def write(self, batch):
+        try:
+            with transaction.atomic():
+                Comment.objects.bulk_create(batch)
+        except IntegrityError:
+            # An article was deleted while its comments were waiting.
+            existing = set(Article.objects.filter(pk__in={comment.article_id for comment in batch})
+                           .values_list('pk', flat=True))
+            dropped = [comment for comment in batch if comment.article_id not in existing]
+            logger.warning('Dropped %d buffered comments for deleted articles', len(dropped))
+            batch = [comment for comment in batch if comment.article_id in existing]
+            with transaction.atomic():
+                Comment.objects.bulk_create(batch)
+        article_pks = {comment.article_id for comment in batch}
+        Article.objects.filter(pk__in=article_pks).refresh_comment_stats()
+        bump_article_versions(article_pks)
+        latest_comments.invalidate()
+
+
+class ArticleViewBuffer(BackgroundBuffer):
+    """Counts article page views in memory and adds them to Article every flush_interval seconds.
+
+    Articles viewed the same number of times since the last flush share one UPDATE, which
+    bumps view_count and folds the views into trending_score (see TRENDING_EPOCH). The
+    counters are not shown on cached pages, so flushing leaves the page cache alone.
+    """
+
+    thread_name = 'article-view-buffer'
+
+    def __init__(self, flush_interval=10, half_life=24 * 60 * 60):
+        super().__init__(flush_interval)
+        self.half_life = half_life
+        self.hits = Counter()
+
+    def add(self, article_pk):
+        with self.lock:
+            self.hits[article_pk] += 1
+            self.start()
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                hits, self.hits = self.hits, Counter()
+            if not hits:
+                return
+            try:
+                self.write(hits, timezone.now())
+            except DatabaseError:
+                logger.exception('Could not write views of %d articles, retrying later', len(hits))
+                with self.lock:
+                    self.hits.update(hits)
+
+    def trending_weight(self, views, now):
+        return math.log(views) + (now - TRENDING_EPOCH).total_seconds() / self.half_life * math.log(2)
+
+    def write(self, hits, now):
+        by_views = defaultdict(list)
+        for article_pk, views in hits.items():
+            by_views[views].append(article_pk)
+        with transaction.atomic():
+            for views, article_pks in by_views.items():
+                weight = Value(self.trending_weight(views, now))
+                score = Greatest(F('trending_score'), weight) + Ln(1 + Exp(-Abs(F('trending_score') - weight)))
+                for chunk in chunks(article_pks):
+                    Article.objects.filter(pk__in=chunk).update(view_count=F('view_count') + views,
+                                                                trending_score=score)
+
+
+_buffers = {}
+_buffers_lock = threading.Lock()
+
+
+def get_buffer(setting, factory):
+    """The process-wide buffer configured by the given setting, or None when it is not ENABLED."""
+    options = getattr(settings, setting)
+    if not options.get('ENABLED'):
+        return None
+    with _buffers_lock:
+        if setting not in _buffers:
+            _buffers[setting] = factory(options)
+            atexit.register(_buffers[setting].close)
+        return _buffers[setting]
+
+
+def get_comment_buffer():
+    return get_buffer('COMMENT_WRITE_BUFFER', lambda options: CommentWriteBuffer(
+        options.get('BATCH_SIZE', 100), options.get('FLUSH_INTERVAL', 0.5)))
+
+
+def get_view_buffer():
+    return get_buffer('ARTICLE_VIEW_BUFFER', lambda options: ArticleViewBuffer(
+        options.get('FLUSH_INTERVAL', 10), options.get('HALF_LIFE', 24 * 60 * 60)))
+
+
+def buffer_comment(request, comment):
+    """Queues an unsaved comment and remembers in the session that its author is waiting for it."""
+    get_comment_buffer().add(comment)
+    pending = request.session.get(PENDING_SESSION_KEY, [])
+    if comment.article_id not in pending:
+        request.session[PENDING_SESSION_KEY] = pending + [comment.article_id]
+
+
+def record_article_view(article_pk):
+    view_buffer = get_view_buffer()
+    if view_buffer is not None:
+        view_buffer.add(article_pk)
+
+
+def flush_pending_comments(request, article_pk):
+    """Writes the buffered comments before rendering an article whose page the visitor just commented on."""
+    # Loading the session of a visitor who has none would add Vary: Cookie to every article page.
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES or PENDING_SESSION_KEY not in request.session:
+        return
+    pending = request.session[PENDING_SESSION_KEY]
+    if article_pk not in pending:
+        return
+    comment_buffer = get_comment_buffer()
+    if comment_buffer is not None:
+        comment_buffer.flush()
+    pending = [pk for pk in pending if pk != article_pk]
+    if pending:
+        request.session[PENDING_SESSION_KEY] = pending
+    else:
+        del request.session[PENDING_SESSION_KEY]
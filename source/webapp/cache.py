@@ -0,0 +1,94 @@
+import threading
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+
+ARTICLES_CHANGED_KEY = 'articles:changed_at'
+
+
+def article_version_key(pk):
+    return 'article:{}:version'.format(pk)
+
+
+def article_changed_key(pk):
+    return 'article:{}:changed_at'.format(pk)
+
+
+def get_article_version(pk):
+    return cache.get_or_set(article_version_key(pk), uuid4().hex, None)
+
+
+def get_article_changed_at(pk):
+    """When the article or anything shown with it last changed; an evicted value restarts at now."""
+    return cache.get_or_set(article_changed_key(pk), timezone.now(), None)
+
+
+def bump_article_versions(pks):
+    now = timezone.now()
+    versions = {ARTICLES_CHANGED_KEY: now}
+    for pk in pks:
+        if pk is not None:
+            versions[article_version_key(pk)] = uuid4().hex
+            versions[article_changed_key(pk)] = now
+    cache.set_many(versions, None)
+
+
+def get_articles_changed_at():
+    return cache.get_or_set(ARTICLES_CHANGED_KEY, timezone.now(), None)
+
+
+def article_page_cache_key(article, page):
+    return 'article:{}:page:{}:{}:{}'.format(
+        article.pk, article.updated_at.timestamp(), get_article_version(article.pk), page
+    )
+
+
+def get_article_page(article, page):
+    return cache.get(article_page_cache_key(article, page))
+
+
+def set_article_page(article, page, content):
+    cache.set(article_page_cache_key(article, page), content, settings.ARTICLE_PAGE_CACHE_TIMEOUT)
+
+
+class LatestComments:
+    """Process-local snapshot of the newest comments, shared by all requests for `timeout` seconds.
+
+    Polling clients asking for comments newer than a recent position are answered from the
+    snapshot; only positions older than the snapshot's oldest comment go to the database.
+    """
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.comments = None
+        self.expires = 0
+
+    def get(self, load):
+        with self.lock:
+            if self.comments is None or time.monotonic() >= self.expires:
+                self.comments = load(self.size)
+                self.expires = time.monotonic() + self.timeout
+            return self.comments
+
+    def invalidate(self):
+        with self.lock:
+            self.comments = None
+
+    def since(self, load, position, limit):
+        """Up to limit comments newer than position, oldest first, or None when the snapshot can't tell."""
+        comments = self.get(load)
+        if position is None:
+            return comments[:limit][::-1]
+        if len(comments) >= self.size and (comments[-1]['created_at'], comments[-1]['id']) > position:
+            return None
+        newer = [comment for comment in comments if (comment['created_at'], comment['id']) > position]
+        return newer[::-1][:limit]
+
+
+latest_comments = LatestComments(settings.COMMENT_FEED_SIZE, settings.COMMENT_FEED_TIMEOUT)
@@ -0,0 +1,70 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import close_old_connections
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_executor():
+    workers = settings.READ_CONCURRENCY
+    if workers <= 0:
+        return None
+    with _executors_lock:
+        if workers not in _executors:
+            _executors[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='webapp-read')
+        return _executors[workers]
+
+
+def _call(context, func):
+    _local.in_pool = True
+    try:
+        return context.run(func)
+    finally:
+        close_old_connections()
+
+
+def run_concurrently(*funcs):
+    """Calls every func and returns their results in order.
+
+    With READ_CONCURRENCY the calls run in the shared thread pool, each against its own database
+    connection, so they only see committed data; context variables such as the read-only routing
+    flag are carried over. Calls made from inside the pool run inline so nested use can't starve
+    the pool.
+    """
+    executor = get_executor()
+    if executor is None or len(funcs) < 2 or getattr(_local, 'in_pool', False):
+        return [func() for func in funcs]
+    futures = [executor.submit(_call, contextvars.copy_context(), func) for func in funcs[1:]]
+    results = [funcs[0]()]
+    results.extend(future.result() for future in futures)
+    return results
+
+
+class ConcurrentPaginator(Paginator):
+    """Paginator that fetches the COUNT and the rows of the requested page at the same time."""
+
+    def page(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return super().page(number)
+        if number < 1 or 'count' in self.__dict__:
+            return super().page(number)
+
+        bottom = (number - 1) * self.per_page
+        count, items = run_concurrently(
+            lambda: self.count,
+            lambda: list(self.object_list[bottom:bottom + self.per_page + self.orphans]),
+        )
+        if number > self.num_pages:
+            return super().page(number)
+        if bottom + self.per_page + self.orphans < count:
+            items = items[:self.per_page]
+        return self._get_page(items, number, self)
@@ -1,24 +1,90 @@
 from django import forms
-from webapp.models import Article, Comment
+from django.utils.dateparse import parse_datetime
+from webapp.models import Article, Comment, get_author, normalize_author
 from django.forms import widgets
 
 
-class ArticleForm(forms.ModelForm):
+class AuthorNameField(forms.CharField):
+    """Text input for an Author foreign key, cleaned to the normalized name or None."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_length', 40)
+        kwargs.setdefault('label', 'Author')
+        super().__init__(**kwargs)
+
+    def has_changed(self, initial, data):
+        return normalize_author(initial) != normalize_author(data)
+
+    def clean(self, value):
+        return normalize_author(super().clean(value)) or None
+
+
+class AuthorNameMixin:
+    """Model form editing the author foreign key by name. The field is left out of Meta so that
+    validation never writes; save() links the named Author, creating it on first use.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.author_id is not None:
+            self.initial.setdefault('author', self.instance.author.name)
+
+    def save(self, commit=True):
+        if self.instance.pk is None or 'author' in self.changed_data:
+            self.instance.author = get_author(self.cleaned_data['author'])
+        return super().save(commit)
+
+
+class VersionedModelForm(forms.ModelForm):
+    """Carries the updated_at of the edited object in a hidden field, for optimistic concurrency checks.
+
+    The field is required when editing, so leaving it out cannot skip the check.
+    """
+    version = forms.CharField(widget=forms.HiddenInput, required=False, error_messages={
+        'required': 'This form is out of date. Reload the page and make your changes again.',
+    })
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.fields['version'].initial = self.instance.updated_at.isoformat()
+            self.fields['version'].required = True
+
+    def clean_version(self):
+        version = self.cleaned_data['version']
+        if not version:
+            return None
+        version = parse_datetime(version)
+        if version is None:
+            raise forms.ValidationError('Invalid version')
+        return version
+
+
+class ArticleForm(AuthorNameMixin, VersionedModelForm):
+    author = AuthorNameField()
+    field_order = ['title', 'text', 'author']
+
     class Meta:
         model = Article
-        exclude = ['created_at', 'updated_at']
+        exclude = ['author', 'created_at', 'updated_at', 'comment_count', 'last_commented_at']
 
 
-class CommentForm(forms.ModelForm):
+class CommentForm(AuthorNameMixin, VersionedModelForm):
+    author = AuthorNameField(required=False)
+    field_order = ['article', 'text', 'author']
+
     class Meta:
         model = Comment
-        exclude = ['created_at', 'updated_at']
+        exclude = ['author', 'created_at', 'updated_at']
+
 
+class ArticleCommentForm(AuthorNameMixin, forms.ModelForm):
+    author = AuthorNameField(required=False)
+    field_order = ['author', 'text']
 
-class ArticleCommentForm(forms.ModelForm):
     class Meta:
         model = Comment
-        fields = ['author', 'text']
+        fields = ['text']
 
 
 class SimpleSearchForm(forms.Form):
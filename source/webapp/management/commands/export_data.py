@@ -0,0 +1,46 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from webapp.transfer import COLUMNS, CsvWriter, NdjsonWriter, export_rows
+
+
+class Command(BaseCommand):
+    help = 'Stream articles, comments, categories and tags out as NDJSON or a directory of CSV files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Output file for ndjson ("-" for stdout), output directory for csv')
+        parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+        parser.add_argument('--models', nargs='+', choices=list(COLUMNS), default=list(COLUMNS))
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched from the database at a time')
+
+    def handle(self, *args, **options):
+        if options['format'] == 'csv':
+            self.dump(CsvWriter(options['path']), options['models'], options['chunk_size'], self.stdout)
+        elif options['path'] == '-':
+            self.dump(NdjsonWriter(sys.stdout), options['models'], options['chunk_size'], self.stderr)
+        else:
+            with open(options['path'], 'w', encoding='utf-8') as stream:
+                self.dump(NdjsonWriter(stream), options['models'], options['chunk_size'], self.stdout)
+
+    def dump(self, writer, models, chunk_size, log):
+        started = time.perf_counter()
+        total = 0
+        try:
+            for name in COLUMNS:
+                if name not in models:
+                    continue
+                model_started = time.perf_counter()
+                count = 0
+                for row in export_rows(name, chunk_size):
+                    writer.write(name, row)
+                    count += 1
+                total += count
+                log.write(rate_line(name, count, time.perf_counter() - model_started))
+        finally:
+            writer.close()
+        log.write(self.style.SUCCESS(rate_line('total', total, time.perf_counter() - started)))
+
+
+def rate_line(name, count, seconds):
+    return '{:<11} {:>10} rows {:>8.2f}s {:>12.0f} rows/s'.format(name, count, seconds, count / seconds if seconds else 0)
@@ -0,0 +1,45 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from webapp.management.commands.export_data import rate_line
+from webapp.transfer import COLUMNS, Importer, read_csv, read_ndjson
+
+
+class Command(BaseCommand):
+    help = 'Stream articles, comments, categories and tags in from NDJSON or a directory of CSV files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Input file for ndjson ("-" for stdin), input directory for csv')
+        parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+        parser.add_argument('--models', nargs='+', choices=list(COLUMNS), default=list(COLUMNS))
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows inserted per transaction')
+        parser.add_argument('--ignore-conflicts', action='store_true',
+                            help='Skip articles and comments whose id already exists')
+
+    def handle(self, *args, **options):
+        importer = Importer(batch_size=options['batch_size'], ignore_conflicts=options['ignore_conflicts'])
+        started = time.perf_counter()
+        if options['format'] == 'csv':
+            self.load(importer, read_csv(options['path'], options['models']), options['models'])
+        elif options['path'] == '-':
+            self.load(importer, read_ndjson(sys.stdin), options['models'])
+        else:
+            with open(options['path'], encoding='utf-8') as stream:
+                self.load(importer, read_ndjson(stream), options['models'])
+
+        for name in COLUMNS:
+            if importer.counts[name]:
+                self.stdout.write(rate_line(name, importer.counts[name], importer.seconds[name]))
+        total = sum(importer.counts.values())
+        self.stdout.write(self.style.SUCCESS(rate_line('total', total, time.perf_counter() - started)))
+
+    def load(self, importer, rows, models):
+        try:
+            for name, row in rows:
+                if name in models:
+                    importer.add(name, row)
+            importer.finish()
+        except (IntegrityError, KeyError, ValueError) as error:
+            raise CommandError('Import failed: {}'.format(error))
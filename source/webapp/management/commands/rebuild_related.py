@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from webapp.related import rebuild_related
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related articles of every article, rewriting only the lists that changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Number of articles read per batch')
+
+    def handle(self, *args, **options):
+        changed = rebuild_related(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS('Updated related articles of {} articles'.format(changed)))
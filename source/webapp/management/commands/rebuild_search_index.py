@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from webapp.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the article full-text search index from scratch'
+
+    def handle(self, *args, **options):
+        get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
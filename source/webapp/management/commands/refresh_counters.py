@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from webapp.archive import rebuild_archive
+from webapp.models import Article, Tag
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized comment counters of articles, article counters of tags and months in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Number of articles updated per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        updated = 0
+        while True:
+            pks = list(Article.objects.filter(pk__gt=last_pk).order_by('pk')
+                       .values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += Article.objects.filter(pk__gte=pks[0], pk__lte=pks[-1]).refresh_comment_stats()
+            last_pk = pks[-1]
+        self.stdout.write(self.style.SUCCESS('Refreshed comment counters of {} articles'.format(updated)))
+        with transaction.atomic():
+            updated = Tag.objects.refresh_article_counts()
+        self.stdout.write(self.style.SUCCESS('Refreshed article counters of {} tags'.format(updated)))
+        rebuild_archive()
+        self.stdout.write(self.style.SUCCESS('Refreshed monthly article counters'))
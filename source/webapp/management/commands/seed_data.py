@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from webapp.seeding import Seeder
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic articles, comments, categories and tags'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--tags', type=int, default=50)
+        parser.add_argument('--tags-per-article', type=int, default=3)
+        parser.add_argument('--hot-share', type=float, default=0.0,
+                            help='Share of comments that go to the newest article, for deep comment pages')
+        parser.add_argument('--days', type=int, default=365, help='Spread creation dates over this many days')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows inserted per transaction')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        Seeder(
+            articles=options['articles'], comments=options['comments'], categories=options['categories'],
+            tags=options['tags'], tags_per_article=options['tags_per_article'], hot_share=options['hot_share'],
+            days=options['days'], batch_size=options['batch_size'], seed=options['seed'],
+        ).run()
+        self.stdout.write(self.style.SUCCESS('Seeded {} articles and {} comments in {:.1f}s'.format(
+            options['articles'], options['comments'], time.perf_counter() - started)))
@@ -0,0 +1,73 @@
+import json
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from webapp.models import Article
+
+
+ASSET_RE = re.compile(r'(?:href|src)="([^"?#]+)"')
+
+
+def file_size(path):
+    return os.path.getsize(path) if os.path.isfile(path) else None
+
+
+class Command(BaseCommand):
+    help = 'Report the static bytes each page loads before and after collectstatic minifies and compresses them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', help='Write the report to this file')
+
+    def handle(self, *args, **options):
+        if not settings.STATIC_ROOT or not os.path.isdir(settings.STATIC_ROOT):
+            raise CommandError('STATIC_ROOT is empty, run collectstatic first')
+        originals = {hashed: name for name, hashed in getattr(staticfiles_storage, 'hashed_files', {}).items()}
+        report = {}
+        for page, url in self.pages():
+            assets = [self.measure(asset, originals) for asset in self.assets(url)]
+            totals = {key: sum(asset[key] or asset['served'] for asset in assets)
+                      for key in ('original', 'served', 'gzip', 'brotli')}
+            report[page] = {'url': url, 'assets': assets, 'totals': totals}
+            best = min(totals['gzip'], totals['brotli'])
+            self.stdout.write('{:<14} {:>2} files  original {:>8}  minified {:>8}  gzip {:>8}  brotli {:>8}  '
+                              'saved {:>8} ({:.0%})'.format(
+                                  page, len(assets), totals['original'], totals['served'], totals['gzip'],
+                                  totals['brotli'], totals['original'] - best,
+                                  1 - best / totals['original'] if totals['original'] else 0))
+        if options['json']:
+            with open(options['json'], 'w') as output:
+                json.dump(report, output, indent=2)
+
+    def pages(self):
+        pages = [('index', reverse('index')), ('comments', reverse('comment_index')), ('tags', reverse('tag_index'))]
+        article = Article.objects.order_by('-created_at').only('pk').first()
+        if article is not None:
+            pages.append(('article', reverse('article_view', kwargs={'pk': article.pk})))
+        return pages
+
+    def assets(self, url):
+        with override_settings(ALLOWED_HOSTS=['*']):
+            response = Client().get(url)
+        html = response.content.decode(response.charset)
+        return sorted({asset for asset in ASSET_RE.findall(html) if asset.startswith(settings.STATIC_URL)})
+
+    def measure(self, url, originals):
+        name = url[len(settings.STATIC_URL):]
+        source = finders.find(originals.get(name, name))
+        served = os.path.join(settings.STATIC_ROOT, name)
+        if not os.path.isfile(served):
+            raise CommandError('{} is not in STATIC_ROOT, run collectstatic again'.format(name))
+        return {
+            'url': url,
+            'original': file_size(source) if source else file_size(served),
+            'served': file_size(served),
+            'gzip': file_size(served + '.gz'),
+            'brotli': file_size(served + '.br'),
+        }
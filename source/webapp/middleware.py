@@ -0,0 +1,267 @@
+import cProfile
+import mimetypes
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotModified, JsonResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+
+class QueryRecorder:
+    """Database execute wrapper counting statements, their time and repeats within one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.statements[(sql, repr(params))] += 1
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count in self.statements.values())
+
+
+class ProfilingStats:
+    """Per-view totals shared by all requests handled by this process."""
+
+    FIELDS = ('requests', 'total_ms', 'max_ms', 'queries', 'sql_ms', 'duplicates', 'template_ms', 'slow')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def record(self, view, total_ms, queries, sql_ms, duplicates, template_ms, slow):
+        with self.lock:
+            entry = self.views.setdefault(view, dict.fromkeys(self.FIELDS, 0))
+            entry['requests'] += 1
+            entry['total_ms'] += total_ms
+            entry['max_ms'] = max(entry['max_ms'], total_ms)
+            entry['queries'] += queries
+            entry['sql_ms'] += sql_ms
+            entry['duplicates'] += duplicates
+            entry['template_ms'] += template_ms
+            entry['slow'] += slow
+
+    def snapshot(self):
+        with self.lock:
+            views = {view: dict(entry) for view, entry in self.views.items()}
+        for entry in views.values():
+            requests = entry['requests']
+            entry['avg_ms'] = round(entry['total_ms'] / requests, 3)
+            entry['avg_queries'] = round(entry['queries'] / requests, 2)
+            entry['avg_sql_ms'] = round(entry['sql_ms'] / requests, 3)
+            entry['avg_template_ms'] = round(entry['template_ms'] / requests, 3)
+            for field in ('total_ms', 'max_ms', 'sql_ms', 'template_ms'):
+                entry[field] = round(entry[field], 3)
+        return views
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+
+
+stats = ProfilingStats()
+
+
+@contextmanager
+def template_timer(request):
+    """Counts the block towards the request's template time, for templates rendered outside a TemplateResponse."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if hasattr(request, '_template_seconds'):
+            request._template_seconds += time.perf_counter() - started
+
+
+class ProfilingMiddleware:
+    """Opt-in request profiler, enabled with PROFILING['ENABLED'].
+
+    Aggregates per-view numbers served as JSON at PROFILING['STATS_PATH'] and dumps cProfile
+    output of sampled requests slower than PROFILING['SLOW_REQUEST_MS'] into
+    PROFILING['PROFILE_DIR']. The stats and the Server-Timing header are only shown to staff
+    users and to INTERNAL_IPS.
+    """
+
+    def __init__(self, get_response):
+        options = settings.PROFILING
+        if not options.get('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.stats_path = options.get('STATS_PATH')
+        self.slow_ms = options.get('SLOW_REQUEST_MS', 500)
+        self.sample_rate = options.get('PROFILE_SAMPLE_RATE', 0.0)
+        self.profile_dir = options.get('PROFILE_DIR')
+
+    def __call__(self, request):
+        if self.stats_path and request.path == self.stats_path:
+            return self.serve_stats(request)
+
+        request._template_seconds = 0.0
+        recorder = QueryRecorder()
+        profiler = cProfile.Profile() if self.profile_dir and random.random() < self.sample_rate else None
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            if profiler:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler:
+                    profiler.disable()
+        total_ms = (time.perf_counter() - started) * 1000
+
+        view = self.get_view_name(request)
+        sql_ms = recorder.seconds * 1000
+        template_ms = request._template_seconds * 1000
+        slow = total_ms >= self.slow_ms
+        stats.record(view, total_ms, recorder.count, sql_ms, recorder.duplicates, template_ms, slow)
+        if profiler and slow:
+            self.dump_profile(profiler, view, total_ms)
+
+        if self.is_trusted(request):
+            response['Server-Timing'] = ', '.join([
+                'total;dur={:.2f}'.format(total_ms),
+                'sql;dur={:.2f};desc="{} queries, {} duplicated"'.format(sql_ms, recorder.count, recorder.duplicates),
+                'tpl;dur={:.2f}'.format(template_ms),
+            ])
+        return response
+
+    def is_trusted(self, request):
+        if request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS:
+            return True
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
+
+    def serve_stats(self, request):
+        # The stats path has no URL pattern: the rest of the stack only runs to authenticate the
+        # request, and whoever is not trusted gets its 404.
+        response = self.get_response(request)
+        if not self.is_trusted(request):
+            return response
+        if request.GET.get('reset'):
+            stats.reset()
+        return JsonResponse({'views': stats.snapshot()})
+
+    def process_template_response(self, request, response):
+        render = response.render
+
+        def timed_render():
+            started = time.perf_counter()
+            try:
+                return render()
+            finally:
+                request._template_seconds += time.perf_counter() - started
+
+        response.render = timed_render
+        return response
+
+    def get_view_name(self, request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return request.path
+        return match.view_name or match._func_path
+
+    def dump_profile(self, profiler, view, total_ms):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        filename = '{}-{}-{:.0f}ms.prof'.format(time.strftime('%Y%m%d-%H%M%S'), re.sub(r'\W+', '_', view), total_ms)
+        profiler.dump_stats(os.path.join(self.profile_dir, filename))
+
+
+def accepted_encodings(header):
+    """Content codings an Accept-Encoding header allows, leaving out those refused with q=0."""
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip() and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFilesMiddleware:
+    """Serves collectstatic output from STATIC_ROOT without going through the URL resolver.
+
+    Picks the .br or .gz variant written by webapp.storage when the client accepts it. Files
+    with a content hash in their name are cached for a year; the rest revalidate after
+    STATIC_MAX_AGE seconds.
+    """
+
+    immutable_max_age = 365 * 24 * 60 * 60
+    encodings = [('br', '.br'), ('gzip', '.gz')]
+
+    def __init__(self, get_response):
+        if not settings.STATIC_ROOT or not settings.STATIC_URL.startswith('/'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.root = settings.STATIC_ROOT
+        self.prefix = settings.STATIC_URL
+        self.max_age = getattr(settings, 'STATIC_MAX_AGE', 60)
+        self.immutable = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    def __call__(self, request):
+        if request.method not in ('GET', 'HEAD') or not request.path.startswith(self.prefix):
+            return self.get_response(request)
+        name = request.path[len(self.prefix):]
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return self.get_response(request)
+        if not os.path.isfile(path):
+            return self.get_response(request)
+
+        stat = os.stat(path)
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime, stat.st_size):
+            return self.add_cache_headers(HttpResponseNotModified(), name, stat)
+
+        content_type, _ = mimetypes.guess_type(name)
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        encoding = None
+        for candidate, suffix in self.encodings:
+            if candidate in accepted and os.path.isfile(path + suffix):
+                encoding = candidate
+                path += suffix
+                break
+
+        response = FileResponse(open(path, 'rb'), content_type=content_type or 'application/octet-stream')
+        response['Content-Length'] = os.path.getsize(path)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        return self.add_cache_headers(response, name, stat)
+
+    def add_cache_headers(self, response, name, stat):
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Vary'] = 'Accept-Encoding'
+        if name in self.immutable:
+            response['Cache-Control'] = 'public, max-age={}, immutable'.format(self.immutable_max_age)
+        else:
+            response['Cache-Control'] = 'public, max-age={}'.format(self.max_age)
+        return response
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE webapp_article_fts USING fts5(title, author, text, tags, tokenize='unicode61')"
+    )
+    schema_editor.execute(
+        "INSERT INTO webapp_article_fts (webapp_article_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0, 3.0)')"
+    )
+    schema_editor.execute("""
+        INSERT INTO webapp_article_fts (rowid, title, author, text, tags)
+        SELECT a.id, a.title, a.author, a.text,
+               COALESCE((SELECT group_concat(t.name, ' ')
+                         FROM webapp_articletag at JOIN webapp_tag t ON t.id = at.tag_id
+                         WHERE at.article_id = a.id), '')
+        FROM webapp_article a
+    """)
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS webapp_article_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0002_tag_articletag'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
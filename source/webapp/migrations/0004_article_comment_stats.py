@@ -0,0 +1,40 @@
+# Generated by Django 2.2 on 2026-10-18 13:11
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_comments(apps, schema_editor):
+    Article = apps.get_model('webapp', 'Article')
+    Comment = apps.get_model('webapp', 'Comment')
+    comments = Comment.objects.filter(article=OuterRef('pk')).order_by()
+    Article.objects.update(
+        comment_count=Coalesce(Subquery(comments.values('article').annotate(count=Count('pk')).values('count')), 0),
+        last_commented_at=Subquery(comments.order_by('-created_at').values('created_at')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0003_article_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Comments'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='last_commented_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Last comment'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-comment_count', '-last_commented_at'], name='article_discussed_idx'),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.2 on 2026-10-18 13:13
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_article_tags(apps, schema_editor):
+    ArticleTag = apps.get_model('webapp', 'ArticleTag')
+    keep = ArticleTag.objects.values('tag', 'article').annotate(keep=Min('pk')).values('keep')
+    ArticleTag.objects.exclude(pk__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0004_article_comment_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-created_at', '-id'], name='article_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['article', '-created_at', '-id'], name='comment_article_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['-created_at', '-id'], name='comment_created_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_article_tags, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='articletag',
+            constraint=models.UniqueConstraint(fields=('tag', 'article'), name='articletag_tag_article_uniq'),
+        ),
+    ]
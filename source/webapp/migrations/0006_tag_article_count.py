@@ -0,0 +1,34 @@
+# Generated by Django 2.2 on 2026-10-18 13:18
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_articles(apps, schema_editor):
+    Tag = apps.get_model('webapp', 'Tag')
+    ArticleTag = apps.get_model('webapp', 'ArticleTag')
+    article_tags = ArticleTag.objects.filter(tag=OuterRef('pk')).order_by()
+    Tag.objects.update(
+        article_count=Coalesce(Subquery(article_tags.values('tag').annotate(count=Count('pk')).values('count')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='article_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Статей'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['-article_count', 'name'], name='tag_article_count_idx'),
+        ),
+        migrations.RunPython(count_articles, migrations.RunPython.noop),
+    ]
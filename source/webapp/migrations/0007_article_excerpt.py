@@ -0,0 +1,46 @@
+# Generated by Django 2.2 on 2026-10-18 13:27
+
+from django.db import migrations, models
+
+
+EXCERPT_LENGTH = 200
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    """Copy of webapp.models.make_excerpt as of this migration."""
+    text = ' '.join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length]
+    end = max(cut.rfind('. '), cut.rfind('! '), cut.rfind('? '))
+    if end >= length // 2:
+        return cut[:end + 1]
+    return cut.rsplit(' ', 1)[0][:length - 1].rstrip(',;:-') + '…'
+
+
+def fill_excerpts(apps, schema_editor):
+    Article = apps.get_model('webapp', 'Article')
+    batch = []
+    for article in Article.objects.only('pk', 'text').iterator(chunk_size=500):
+        article.excerpt = make_excerpt(article.text)
+        batch.append(article)
+        if len(batch) >= 500:
+            Article.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    Article.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0006_tag_article_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=200, verbose_name='Excerpt'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2 on 2026-10-18 13:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0007_article_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False, verbose_name='Trending score'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Views'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-trending_score', '-id'], name='article_trending_idx'),
+        ),
+    ]
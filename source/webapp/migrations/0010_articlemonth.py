@@ -0,0 +1,34 @@
+# Generated by Django 2.2 on 2026-10-18 13:44
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def count_months(apps, schema_editor):
+    Article = apps.get_model('webapp', 'Article')
+    ArticleMonth = apps.get_model('webapp', 'ArticleMonth')
+    counts = Article.objects.annotate(month=TruncMonth('created_at')).order_by()\
+        .values('month').annotate(count=Count('pk')).values_list('month', 'count')
+    ArticleMonth.objects.bulk_create([ArticleMonth(month=timezone.localtime(month).date(), article_count=count)
+                                      for month, count in counts])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0009_relatedarticle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleMonth',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True, verbose_name='Month')),
+                ('article_count', models.PositiveIntegerField(default=0, verbose_name='Articles')),
+            ],
+        ),
+        migrations.RunPython(count_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 2.2 on 2026-10-18 13:52
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+BATCH_SIZE = 1000
+UNKNOWN_AUTHOR = 'Unknown'
+
+
+def normalize_author(name):
+    return ' '.join((name or '').split())[:40]
+
+# (model, name stored when the author is empty, old default that means "no author")
+AUTHOR_COLUMNS = [('Article', UNKNOWN_AUTHOR, None), ('Comment', None, 'Anonymous')]
+
+
+def link_authors(apps, schema_editor):
+    """Points every article and comment at an Author, one Author per distinct normalized name.
+
+    Rows are read BATCH_SIZE at a time by primary key; each batch creates the names not seen
+    yet with one INSERT and links its rows with one UPDATE per author. The "Unknown" author
+    articles are saved under when none is given is created even if there are no rows.
+    """
+    Author = apps.get_model('webapp', 'Author')
+    unknown = Author.objects.get_or_create(name=UNKNOWN_AUTHOR)[0]
+    authors = {unknown.name: unknown.pk}
+    for model_name, fallback, anonymous in AUTHOR_COLUMNS:
+        model = apps.get_model('webapp', model_name)
+        last_pk = 0
+        while True:
+            rows = list(model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'author')[:BATCH_SIZE])
+            if not rows:
+                break
+            names = {}
+            for pk, name in rows:
+                name = normalize_author(name)
+                names[pk] = name if name and name != anonymous else fallback
+            missing = {name for name in names.values() if name and name not in authors}
+            if missing:
+                Author.objects.bulk_create([Author(name=name) for name in missing], ignore_conflicts=True)
+                authors.update(Author.objects.filter(name__in=missing).values_list('name', 'pk'))
+            by_author = defaultdict(list)
+            for pk, name in names.items():
+                if name:
+                    by_author[authors[name]].append(pk)
+            for author_pk, pks in by_author.items():
+                model.objects.filter(pk__in=pks).update(author_ref=author_pk)
+            last_pk = rows[-1][0]
+
+
+def copy_author_names(apps, schema_editor):
+    Author = apps.get_model('webapp', 'Author')
+    for model_name, fallback, anonymous in AUTHOR_COLUMNS:
+        model = apps.get_model('webapp', model_name)
+        name = Subquery(Author.objects.filter(pk=OuterRef('author_ref')).values('name')[:1])
+        model.objects.update(author=Coalesce(name, Value(fallback or anonymous)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0010_articlemonth'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Author',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=40, unique=True, verbose_name='Name')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='author_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+',
+                                    to='webapp.Author'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='author_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+',
+                                    to='webapp.Author'),
+        ),
+        migrations.RunPython(link_authors, copy_author_names),
+        migrations.RemoveField(
+            model_name='article',
+            name='author',
+        ),
+        migrations.RemoveField(
+            model_name='comment',
+            name='author',
+        ),
+        migrations.RenameField(
+            model_name='article',
+            old_name='author_ref',
+            new_name='author',
+        ),
+        migrations.RenameField(
+            model_name='comment',
+            old_name='author_ref',
+            new_name='author',
+        ),
+        migrations.AlterField(
+            model_name='article',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='articles',
+                                    to='webapp.Author', verbose_name='Author'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='author',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT,
+                                    related_name='comments', to='webapp.Author', verbose_name='Author'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='article_author_created_idx'),
+        ),
+    ]
@@ -1,15 +1,89 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+EXCERPT_LENGTH = 200
+UNKNOWN_AUTHOR = 'Unknown'
+ANONYMOUS_AUTHOR = 'Anonymous'
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    """The first sentences of text that fit in length characters, or its first words with an ellipsis."""
+    text = ' '.join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length]
+    end = max(cut.rfind('. '), cut.rfind('! '), cut.rfind('? '))
+    if end >= length // 2:
+        return cut[:end + 1]
+    return cut.rsplit(' ', 1)[0][:length - 1].rstrip(',;:-') + '…'
+
+
+def normalize_author(name):
+    """The name authors are stored and de-duplicated under: whitespace collapsed, cut to the column size."""
+    return ' '.join((name or '').split())[:40]
+
+
+def get_author(name):
+    """The Author stored under the normalized name, created on first use; None for a blank name."""
+    name = normalize_author(name)
+    if not name:
+        return None
+    return Author.objects.get_or_create(name=name)[0]
+
+
+class ArticleQuerySet(models.QuerySet):
+    def refresh_comment_stats(self):
+        comments = Comment.objects.filter(article=OuterRef('pk')).order_by()
+        return self.update(
+            comment_count=Coalesce(Subquery(comments.values('article').annotate(count=Count('pk')).values('count')), 0),
+            last_commented_at=Subquery(comments.order_by('-created_at').values('created_at')[:1]),
+        )
+
+
+class TagQuerySet(models.QuerySet):
+    def refresh_article_counts(self):
+        article_tags = ArticleTag.objects.filter(tag=OuterRef('pk')).order_by()
+        return self.update(
+            article_count=Coalesce(Subquery(article_tags.values('tag').annotate(count=Count('pk')).values('count')), 0),
+        )
 
 
 class Article(models.Model):
     title = models.CharField(max_length=200, null=False, blank=False, verbose_name='Title')
     text = models.TextField(max_length=3000, null=False, blank=False, verbose_name='Text')
-    author = models.CharField(max_length=40, null=False, blank=False, default='Unknown', verbose_name='Author')
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False, verbose_name='Excerpt')
+    author = models.ForeignKey('webapp.Author', on_delete=models.PROTECT, related_name='articles',
+                               verbose_name='Author')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Date of creation')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Change time')
     category = models.ForeignKey('Category', on_delete=models.PROTECT, null=True, blank=True, verbose_name='Category',
                                  related_name='articles')
     tags = models.ManyToManyField('webapp.Tag', related_name='articles', through='webapp.ArticleTag', through_fields=('article', 'tag'), blank=True)
+    comment_count = models.PositiveIntegerField(default=0, verbose_name='Comments')
+    last_commented_at = models.DateTimeField(null=True, blank=True, verbose_name='Last comment')
+    view_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='Views')
+    trending_score = models.FloatField(default=0, editable=False, verbose_name='Trending score')
+
+    objects = ArticleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='article_created_idx'),
+            models.Index(fields=['-comment_count', '-last_commented_at'], name='article_discussed_idx'),
+            models.Index(fields=['-trending_score', '-id'], name='article_trending_idx'),
+            models.Index(fields=['author', '-created_at', '-id'], name='article_author_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.author_id is None:
+            self.author = get_author(UNKNOWN_AUTHOR)
+        self.excerpt = make_excerpt(self.text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'excerpt'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
@@ -19,14 +93,34 @@ class Comment(models.Model):
     article = models.ForeignKey('webapp.Article', related_name='comments',
                                 on_delete=models.CASCADE, verbose_name='Article')
     text = models.TextField(max_length=400, verbose_name='Comment')
-    author = models.CharField(max_length=40, null=True, blank=True, default='Anonymous', verbose_name='Author')
+    author = models.ForeignKey('webapp.Author', on_delete=models.PROTECT, null=True, blank=True,
+                               related_name='comments', verbose_name='Author')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Date of creation')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Change time')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['article', '-created_at', '-id'], name='comment_article_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='comment_created_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_article_id = instance.__dict__.get('article_id')
+        return instance
+
     def __str__(self):
         return self.text[:20]
 
 
+class Author(models.Model):
+    name = models.CharField(max_length=40, unique=True, verbose_name='Name')
+
+    def __str__(self):
+        return self.name
+
+
 class Category(models.Model):
     name = models.CharField(max_length=20, verbose_name='Name')
 
@@ -37,6 +131,14 @@ class Category(models.Model):
 class Tag(models.Model):
    name = models.CharField(max_length=31, verbose_name='Тег')
    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Время создания')
+   article_count = models.PositiveIntegerField(default=0, verbose_name='Статей')
+
+   objects = TagQuerySet.as_manager()
+
+   class Meta:
+       indexes = [
+           models.Index(fields=['-article_count', 'name'], name='tag_article_count_idx'),
+       ]
 
    def __str__(self):
        return self.name
@@ -46,5 +148,41 @@ class ArticleTag(models.Model):
    article = models.ForeignKey('webapp.Article', related_name='article_tags', on_delete=models.CASCADE, verbose_name='Статья')
    tag = models.ForeignKey('webapp.Tag', related_name='tag_articles', on_delete=models.CASCADE, verbose_name='Тег')
 
+   class Meta:
+       constraints = [
+           models.UniqueConstraint(fields=['tag', 'article'], name='articletag_tag_article_uniq'),
+       ]
+
+   @classmethod
+   def from_db(cls, db, field_names, values):
+       instance = super().from_db(db, field_names, values)
+       instance._loaded_pair = (instance.__dict__.get('article_id'), instance.__dict__.get('tag_id'))
+       return instance
+
    def __str__(self):
-       return "{} | {}".format(self.article, self.tag)
\ No newline at end of file
+       return "{} | {}".format(self.article, self.tag)
+
+class RelatedArticle(models.Model):
+    """Precomputed "related articles" of an article, maintained by webapp.related."""
+    article = models.ForeignKey('webapp.Article', related_name='related_links', on_delete=models.CASCADE,
+                                verbose_name='Article')
+    related = models.ForeignKey('webapp.Article', related_name='+', on_delete=models.CASCADE,
+                                verbose_name='Related article')
+    score = models.PositiveIntegerField(verbose_name='Score')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'related'], name='relatedarticle_article_related_uniq'),
+        ]
+
+    def __str__(self):
+        return "{} | {}".format(self.article_id, self.related_id)
+
+
+class ArticleMonth(models.Model):
+    """Number of articles created in each month, maintained by webapp.archive."""
+    month = models.DateField(unique=True, verbose_name='Month')
+    article_count = models.PositiveIntegerField(default=0, verbose_name='Articles')
+
+    def __str__(self):
+        return '{:%Y-%m}: {}'.format(self.month, self.article_count)
@@ -0,0 +1,97 @@
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from webapp.archive import month_of, refresh_months
+from webapp.cache import bump_article_versions, latest_comments
+from webapp.models import Article, ArticleTag, Comment, RelatedArticle, Tag
+from webapp.related import linking_articles, refresh_related, refresh_related_for_tags
+from webapp.search import get_search_backend
+from webapp.utils import chunks
+
+
+# Set-based versions of the admin's per-object operations: a handful of statements per chunk of
+# rows (webapp.utils.CHUNK_SIZE) instead of a collector walk and per-row signals. They go around
+# Model.delete() and the signals, so each deletes the cascaded rows and keeps the counters,
+# search index, related articles and page cache in sync itself.
+
+
+def raw_delete(queryset):
+    """A single DELETE ... WHERE: no collector, no cascades and no delete signals.
+
+    QuerySet.delete() would load every row to send pre_delete/post_delete, which is what
+    these operations avoid; _raw_delete() is the statement Django itself runs for fast deletes.
+    """
+    return queryset._raw_delete(router.db_for_write(queryset.model))
+
+
+def delete_articles(queryset):
+    pks = list(queryset.values_list('pk', flat=True))
+    deleted = 0
+    linking = set()
+    months = set()
+    with transaction.atomic():
+        for chunk in chunks(pks):
+            tag_pks = set(ArticleTag.objects.filter(article_id__in=chunk).values_list('tag_id', flat=True))
+            linking.update(linking_articles(chunk))
+            months.update(map(month_of, Article.objects.filter(pk__in=chunk).values_list('created_at', flat=True)))
+            raw_delete(Comment.objects.filter(article_id__in=chunk))
+            raw_delete(ArticleTag.objects.filter(article_id__in=chunk))
+            raw_delete(RelatedArticle.objects.filter(Q(article_id__in=chunk) | Q(related_id__in=chunk)))
+            deleted += raw_delete(Article.objects.filter(pk__in=chunk))
+            get_search_backend().remove_articles(chunk)
+            Tag.objects.filter(pk__in=tag_pks).refresh_article_counts()
+        refresh_months(months)
+    bump_article_versions(set(pks) | linking)
+    latest_comments.invalidate()
+    refresh_related(linking - set(pks))
+    return deleted
+
+
+def set_category(queryset, category):
+    pks = list(queryset.values_list('pk', flat=True))
+    now = timezone.now()
+    with transaction.atomic():
+        for chunk in chunks(pks):
+            Article.objects.filter(pk__in=chunk).update(category=category, updated_at=now)
+    bump_article_versions(pks)
+    refresh_related(set(pks) | linking_articles(pks))
+    return len(pks)
+
+
+def add_tag(queryset, tag):
+    pks = list(queryset.values_list('pk', flat=True))
+    with transaction.atomic():
+        for chunk in chunks(pks):
+            ArticleTag.objects.bulk_create([ArticleTag(article_id=pk, tag=tag) for pk in chunk], ignore_conflicts=True)
+            get_search_backend().index_articles(chunk)
+        Tag.objects.filter(pk=tag.pk).refresh_article_counts()
+    bump_article_versions(pks)
+    refresh_related_for_tags(pks, [tag.pk])
+    return len(pks)
+
+
+def remove_tag(queryset, tag):
+    pks = list(queryset.filter(article_tags__tag=tag).values_list('pk', flat=True))
+    with transaction.atomic():
+        for chunk in chunks(pks):
+            raw_delete(ArticleTag.objects.filter(article_id__in=chunk, tag=tag))
+            get_search_backend().index_articles(chunk)
+        Tag.objects.filter(pk=tag.pk).refresh_article_counts()
+    bump_article_versions(pks)
+    refresh_related_for_tags(pks, [tag.pk])
+    return len(pks)
+
+
+def delete_comments(queryset):
+    pks = list(queryset.values_list('pk', flat=True))
+    article_pks = set()
+    deleted = 0
+    with transaction.atomic():
+        for chunk in chunks(pks):
+            article_pks.update(Comment.objects.filter(pk__in=chunk).values_list('article_id', flat=True))
+            deleted += raw_delete(Comment.objects.filter(pk__in=chunk))
+        for chunk in chunks(article_pks):
+            Article.objects.filter(pk__in=chunk).refresh_comment_stats()
+    bump_article_versions(article_pks)
+    latest_comments.invalidate()
+    return deleted
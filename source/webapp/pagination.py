@@ -0,0 +1,112 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_cursor(obj, direction):
+    if isinstance(obj, dict):
+        position = [obj['created_at'].isoformat(), obj['id'], direction]
+    else:
+        position = [obj.created_at.isoformat(), obj.pk, direction]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        created_at, pk, direction = json.loads(raw.decode())
+        created_at = parse_datetime(created_at)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        return None
+    if created_at is None or not isinstance(pk, int) or direction not in (NEXT, PREVIOUS):
+        return None
+    return created_at, pk, direction
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return encode_cursor(self.object_list[-1], NEXT)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return encode_cursor(self.object_list[0], PREVIOUS)
+        return None
+
+
+class CursorPaginator:
+    """Keyset paginator over (-created_at, -pk): no COUNT and no OFFSET, whatever the depth."""
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    def get_page(self, cursor):
+        position = decode_cursor(cursor)
+        queryset = self.object_list
+        if position is None:
+            items = list(queryset.order_by('-created_at', '-pk')[:self.per_page + 1])
+            return CursorPage(items[:self.per_page], self, len(items) > self.per_page, False)
+
+        created_at, pk, direction = position
+        if direction == NEXT:
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+            items = list(queryset.order_by('-created_at', '-pk')[:self.per_page + 1])
+            return CursorPage(items[:self.per_page], self, len(items) > self.per_page, True)
+
+        queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+        items = list(queryset.order_by('created_at', 'pk')[:self.per_page + 1])
+        return CursorPage(items[:self.per_page][::-1], self, True, len(items) > self.per_page)
+
+
+class CursorPaginationMixin:
+    cursor_param = 'cursor'
+
+    def use_cursor_pagination(self):
+        return self.cursor_param in self.request.GET or settings.PAGINATION_MODE == 'cursor'
+
+    def get_cursor_page(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size)
+        return paginator, paginator.get_page(self.request.GET.get(self.cursor_param))
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator, page = self.get_cursor_page(queryset, page_size)
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,160 @@
+import heapq
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from webapp.cache import bump_article_versions
+from webapp.models import Article, ArticleTag, RelatedArticle
+
+
+# An article's related articles are the RELATED_LIMIT others sharing most of its tags, a shared
+# category breaking ties; articles with too few of those are topped up with the newest articles
+# of their category. The lists live in RelatedArticle and are refreshed when tags change.
+
+RELATED_LIMIT = 5
+TAG_WEIGHT = 2
+CATEGORY_WEIGHT = 1
+
+
+def candidate_scores(article_pks):
+    """{related pk: score} of every candidate of each article.
+
+    Reads the tag memberships of the articles' tags once and counts shared tags in Python,
+    which moves far fewer rows than a self-join of ArticleTag grouped per pair.
+    """
+    categories = dict(Article.objects.filter(pk__in=set(article_pks)).values_list('pk', 'category_id'))
+    tags = defaultdict(list)
+    for article_pk, tag_pk in ArticleTag.objects.filter(article_id__in=categories).values_list('article_id', 'tag_id'):
+        tags[article_pk].append(tag_pk)
+    members = defaultdict(list)
+    for tag_pk, article_pk, category_pk in ArticleTag.objects\
+            .filter(tag_id__in={tag_pk for tag_pks in tags.values() for tag_pk in tag_pks})\
+            .values_list('tag_id', 'article_id', 'article__category_id'):
+        members[tag_pk].append(article_pk)
+        categories.setdefault(article_pk, category_pk)
+
+    candidates = {}
+    for pk in article_pks:
+        if pk not in categories:
+            candidates[pk] = {}
+            continue
+        shared = Counter()
+        for tag_pk in tags[pk]:
+            shared.update(members[tag_pk])
+        shared.pop(pk, None)
+        category_pk = categories[pk]
+        candidates[pk] = {related_pk: count * TAG_WEIGHT for related_pk, count in shared.items()}
+        if category_pk:
+            for related_pk in candidates[pk]:
+                if categories[related_pk] == category_pk:
+                    candidates[pk][related_pk] += CATEGORY_WEIGHT
+
+    by_category = defaultdict(list)
+    for pk, scores in candidates.items():
+        if len(scores) < RELATED_LIMIT and categories.get(pk):
+            by_category[categories[pk]].append(pk)
+    for category_pk, pks in by_category.items():
+        newest = list(Article.objects.filter(category_id=category_pk).order_by('-created_at', '-id')
+                      .values_list('pk', flat=True)[:2 * RELATED_LIMIT + 1])
+        for pk in pks:
+            for related_pk in newest:
+                if related_pk != pk:
+                    candidates[pk].setdefault(related_pk, CATEGORY_WEIGHT)
+    return candidates
+
+
+def related_scores(article_pks):
+    """The best RELATED_LIMIT (related pk, score) pairs of each article, highest score and newest first."""
+    return {pk: heapq.nlargest(RELATED_LIMIT, scores.items(), key=lambda item: (item[1], item[0]))
+            for pk, scores in candidate_scores(article_pks).items()}
+
+
+def current_related(article_pks, chunk_size=500):
+    """The stored [(related pk, score)] list of each article, best first."""
+    pks = sorted(set(article_pks))
+    current = defaultdict(list)
+    for start in range(0, len(pks), chunk_size):
+        links = RelatedArticle.objects.filter(article_id__in=pks[start:start + chunk_size])\
+            .order_by('article_id', '-score', '-related_id').values_list('article_id', 'related_id', 'score')
+        for article_pk, related_pk, score in links:
+            current[article_pk].append((related_pk, score))
+    return current
+
+
+def refresh_related(article_pks, chunk_size=500):
+    """Recomputes the related articles of the given articles.
+
+    Only the lists that actually changed are rewritten and dropped from the page cache.
+    Returns how many changed.
+    """
+    pks = sorted(set(article_pks))
+    changed = []
+    for start in range(0, len(pks), chunk_size):
+        chunk = pks[start:start + chunk_size]
+        scores = related_scores(chunk)
+        current = current_related(chunk, chunk_size)
+        stale = [pk for pk in chunk if current[pk] != scores[pk]]
+        if not stale:
+            continue
+        with transaction.atomic():
+            RelatedArticle.objects.filter(article_id__in=stale).delete()
+            RelatedArticle.objects.bulk_create([
+                RelatedArticle(article_id=pk, related_id=related_pk, score=score)
+                for pk in stale for related_pk, score in scores[pk]
+            ])
+        changed.extend(stale)
+    bump_article_versions(changed)
+    return len(changed)
+
+
+def refresh_related_for_tags(article_pks, tag_pks):
+    """Refreshes articles whose tags changed, and the other articles of the changed tags whose lists they
+    now enter, leave or move down in.
+
+    Scores are symmetric, so a changed article's candidate scores are also what it scores in each
+    other article's list. Only the lists where that score differs from the stored one, or now beats
+    the stored list's last entry, are recomputed; the rest of a popular tag is left alone.
+    """
+    article_pks = set(article_pks)
+    scores = candidate_scores(article_pks)
+    members = set(ArticleTag.objects.filter(tag_id__in=tag_pks).values_list('article_id', flat=True)) - article_pks
+    listing = linking_articles(article_pks) & members
+    scored = {member for pk in article_pks for member in scores.get(pk, {}) if member in members}
+    current = current_related(listing | scored)
+    affected = set()
+    for member in listing | scored:
+        listed = dict(current[member])
+        last = min(((score, pk) for pk, score in listed.items()), default=None)
+        for pk in article_pks:
+            score = scores.get(pk, {}).get(member, 0)
+            if pk in listed:
+                moved = score != listed[pk]
+            else:
+                moved = score > 0 and (len(listed) < RELATED_LIMIT or (score, pk) > last)
+            if moved:
+                affected.add(member)
+                break
+    return refresh_related(article_pks | affected)
+
+
+def refresh_related_on_commit(article_pks, tag_pks=()):
+    """Schedules a refresh for when the current transaction commits, so deleted articles are gone by then."""
+    article_pks = {pk for pk in article_pks if pk is not None}
+    tag_pks = {pk for pk in tag_pks if pk is not None}
+    transaction.on_commit(lambda: refresh_related_for_tags(article_pks, tag_pks))
+
+
+def linking_articles(article_pks):
+    """Pks of the articles listing any of the given articles as related."""
+    return set(RelatedArticle.objects.filter(related_id__in=article_pks).values_list('article_id', flat=True))
+
+
+def rebuild_related(batch_size=5000):
+    """Refreshes the related articles of every article; returns how many lists changed."""
+    last_pk = 0
+    changed = 0
+    while True:
+        pks = list(Article.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return changed
+        changed += refresh_related(pks)
+        last_pk = pks[-1]
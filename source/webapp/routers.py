@@ -0,0 +1,45 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+READ_ONLY_ALIAS = 'readonly'
+
+_read_only = ContextVar('read_only', default=False)
+
+
+@contextmanager
+def read_only_database():
+    """Sends the reads made inside the block to the 'readonly' database alias, when configured."""
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+class ReadOnlyRouter:
+    def db_for_read(self, model, **hints):
+        if _read_only.get() and READ_ONLY_ALIAS in settings.DATABASES:
+            return READ_ONLY_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReadOnlyDatabaseMixin:
+    """Runs GET and HEAD requests of a view against the read-only database alias."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        with read_only_database():
+            return super().dispatch(request, *args, **kwargs)
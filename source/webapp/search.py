@@ -0,0 +1,102 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+from webapp.models import Article, ArticleTag
+
+
+FTS_TABLE = 'webapp_article_fts'
+
+INDEX_SQL = """
+    INSERT INTO {fts} (rowid, title, author, text, tags)
+    SELECT a.id, a.title, COALESCE((SELECT name FROM webapp_author WHERE id = a.author_id), ''), a.text,
+           COALESCE((SELECT group_concat(t.name, ' ')
+                     FROM webapp_articletag at JOIN webapp_tag t ON t.id = at.tag_id
+                     WHERE at.article_id = a.id), '')
+    FROM webapp_article a
+"""
+
+
+def split_terms(query):
+    return re.findall(r'\w+', query or '')
+
+
+class BaseSearchBackend:
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def index_articles(self, pks):
+        pass
+
+    def remove_articles(self, pks):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """Fallback for databases without full-text support: substring match on every indexed field."""
+
+    def search(self, queryset, query):
+        for term in split_terms(query):
+            tagged = ArticleTag.objects.filter(tag__name__icontains=term).values('article_id')
+            queryset = queryset.filter(
+                Q(title__icontains=term)
+                | Q(author__name__icontains=term)
+                | Q(text__icontains=term)
+                | Q(pk__in=tagged)
+            )
+        return queryset
+
+
+class SqliteFtsSearchBackend(BaseSearchBackend):
+    """Ranked prefix search over the FTS5 table created by migration 0003_article_fts."""
+
+    def build_match(self, query):
+        return ' '.join('"{}"*'.format(term) for term in split_terms(query))
+
+    def search(self, queryset, query):
+        match = self.build_match(query)
+        if not match:
+            return queryset
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=['{}.rowid = {}.id'.format(FTS_TABLE, Article._meta.db_table),
+                   '{} MATCH %s'.format(FTS_TABLE)],
+            params=[match],
+            select={'search_rank': '{}.rank'.format(FTS_TABLE)},
+        ).order_by('search_rank', *queryset.query.order_by)
+
+    def index_articles(self, pks):
+        pks = list(pks)
+        if not pks:
+            return
+        placeholders = ', '.join(['%s'] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM {} WHERE rowid IN ({})'.format(FTS_TABLE, placeholders), pks)
+            cursor.execute(INDEX_SQL.format(fts=FTS_TABLE) + ' WHERE a.id IN ({})'.format(placeholders), pks)
+
+    def remove_articles(self, pks):
+        pks = list(pks)
+        if not pks:
+            return
+        placeholders = ', '.join(['%s'] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM {} WHERE rowid IN ({})'.format(FTS_TABLE, placeholders), pks)
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM {}'.format(FTS_TABLE))
+            cursor.execute(INDEX_SQL.format(fts=FTS_TABLE))
+
+
+def get_search_backend():
+    backend = getattr(settings, 'SEARCH_BACKEND', None)
+    if backend:
+        return import_string(backend)()
+    if connection.vendor == 'sqlite':
+        return SqliteFtsSearchBackend()
+    return SimpleSearchBackend()
@@ -0,0 +1,153 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from webapp.archive import rebuild_archive
+from webapp.models import Article, ArticleTag, Author, Category, Comment, Tag, make_excerpt
+from webapp.related import rebuild_related
+from webapp.search import get_search_backend
+
+
+WORDS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore '
+    'et dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip '
+    'ex ea commodo consequat duis aute irure in reprehenderit voluptate velit esse cillum fugiat nulla '
+    'pariatur excepteur sint occaecat cupidatat non proident sunt culpa qui officia deserunt mollit anim'
+).split()
+
+AUTHORS = ['Unknown', 'Tom John Mark', 'Anna Lee', 'Ivan Petrov', 'Aisulu', 'Maria Garcia', 'Chen Wei']
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create() keep the given created_at/updated_at values instead of auto_now ones."""
+    fields = [field for model in models for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+class Seeder:
+    """Generates synthetic articles, comments, categories and tags with bulk_create()."""
+
+    def __init__(self, articles=1000, comments=10000, categories=10, tags=50, tags_per_article=3,
+                 hot_share=0.0, days=365, batch_size=1000, seed=None):
+        self.articles = articles
+        self.comments = comments
+        self.categories = categories
+        self.tags = tags
+        self.tags_per_article = tags_per_article
+        self.hot_share = hot_share
+        self.days = days
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.now = timezone.now()
+
+    def words(self, count):
+        return ' '.join(self.random.choice(WORDS) for _ in range(count))
+
+    def moment(self, after=None):
+        start = after or self.now - timedelta(days=self.days)
+        span = max((self.now - start).total_seconds(), 1)
+        return start + timedelta(seconds=self.random.uniform(0, span))
+
+    def insert(self, model, objects):
+        with transaction.atomic():
+            model.objects.bulk_create(objects)
+
+    def run(self):
+        with explicit_timestamps(Article, Comment, Tag):
+            author_pks = self.seed_authors()
+            category_pks = self.seed_categories()
+            tag_pks = self.seed_tags()
+            articles = self.seed_articles(author_pks, category_pks)
+            self.seed_article_tags(articles, tag_pks)
+            self.seed_comments(articles, author_pks + [None])
+        self.refresh(articles)
+
+    def seed_authors(self):
+        return [Author.objects.get_or_create(name=name)[0].pk for name in AUTHORS]
+
+    def seed_categories(self):
+        first = next_pk(Category)
+        self.insert(Category, [Category(pk=first + i, name='Category {}'.format(first + i)[:20])
+                               for i in range(self.categories)])
+        return list(range(first, first + self.categories)) or [None]
+
+    def seed_tags(self):
+        first = next_pk(Tag)
+        self.insert(Tag, [Tag(pk=first + i, name='{}-{}'.format(self.random.choice(WORDS), first + i),
+                              created_at=self.now)
+                          for i in range(self.tags)])
+        return list(range(first, first + self.tags))
+
+    def seed_articles(self, author_pks, category_pks):
+        first = next_pk(Article)
+        articles = []
+        batch = []
+        for pk in range(first, first + self.articles):
+            created_at = self.moment()
+            text = self.words(self.random.randint(30, 300))
+            batch.append(Article(
+                pk=pk, title=self.words(6).capitalize(), text=text, excerpt=make_excerpt(text),
+                author_id=self.random.choice(author_pks), category_id=self.random.choice(category_pks),
+                created_at=created_at, updated_at=created_at,
+            ))
+            articles.append((pk, created_at))
+            if len(batch) >= self.batch_size:
+                self.insert(Article, batch)
+                batch = []
+        self.insert(Article, batch)
+        return articles
+
+    def seed_article_tags(self, articles, tag_pks):
+        count = min(self.tags_per_article, len(tag_pks))
+        batch = []
+        for pk, _ in articles:
+            batch.extend(ArticleTag(article_id=pk, tag_id=tag_pk) for tag_pk in self.random.sample(tag_pks, count))
+            if len(batch) >= self.batch_size:
+                self.insert(ArticleTag, batch)
+                batch = []
+        self.insert(ArticleTag, batch)
+
+    def seed_comments(self, articles, author_pks):
+        if not articles:
+            return
+        first = next_pk(Comment)
+        batch = []
+        for pk in range(first, first + self.comments):
+            if self.random.random() < self.hot_share:
+                article_pk, article_created_at = articles[0]
+            else:
+                article_pk, article_created_at = self.random.choice(articles)
+            created_at = self.moment(after=article_created_at)
+            batch.append(Comment(
+                pk=pk, article_id=article_pk, text=self.words(self.random.randint(5, 40)),
+                author_id=self.random.choice(author_pks), created_at=created_at, updated_at=created_at,
+            ))
+            if len(batch) >= self.batch_size:
+                self.insert(Comment, batch)
+                batch = []
+        self.insert(Comment, batch)
+
+    def refresh(self, articles):
+        """bulk_create() sends no signals, so rebuild what they would have maintained."""
+        if articles:
+            Article.objects.filter(pk__gte=articles[0][0]).refresh_comment_stats()
+        Tag.objects.refresh_article_counts()
+        get_search_backend().rebuild()
+        rebuild_related()
+        rebuild_archive()
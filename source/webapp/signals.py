@@ -0,0 +1,168 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from webapp.archive import month_of, refresh_months
+from webapp.cache import bump_article_versions, latest_comments
+from webapp.models import Article, ArticleTag, Author, Category, Comment, Tag
+from webapp.related import linking_articles, refresh_related_on_commit
+from webapp.search import get_search_backend
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = settings.SQLITE_PRAGMAS.get(connection.alias, {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute('PRAGMA {} = {}'.format(name, value))
+
+
+@receiver(post_save, sender=Article)
+def index_article(sender, instance, **kwargs):
+    get_search_backend().index_articles([instance.pk])
+    bump_article_versions([instance.pk])
+
+
+@receiver(post_save, sender=Article)
+def refresh_article_related(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw or not (update_fields is None or 'category' in update_fields):
+        return
+    refresh_related_on_commit({instance.pk} | linking_articles([instance.pk]))
+
+
+@receiver(post_save, sender=Article)
+def bump_linking_articles(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    # Cached pages of the articles listing this one as related show its title.
+    if created or raw or not (update_fields is None or 'title' in update_fields):
+        return
+    bump_article_versions(linking_articles([instance.pk]))
+
+
+@receiver(post_save, sender=Article)
+def count_article_month(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        refresh_months([month_of(instance.created_at)])
+
+
+@receiver(post_delete, sender=Article)
+def uncount_article_month(sender, instance, **kwargs):
+    refresh_months([month_of(instance.created_at)])
+
+
+@receiver(post_delete, sender=Article)
+def unindex_article(sender, instance, **kwargs):
+    get_search_backend().remove_articles([instance.pk])
+    bump_article_versions([instance.pk])
+
+
+@receiver(pre_delete, sender=Article)
+def refresh_linking_articles(sender, instance, **kwargs):
+    # The cascade drops the links to this article, whether or not the refresh finds a replacement.
+    linking = linking_articles([instance.pk])
+    transaction.on_commit(lambda: bump_article_versions(linking))
+    refresh_related_on_commit(linking)
+
+
+def article_tags_changed(article_pks, tag_pks):
+    article_pks = {pk for pk in article_pks if pk is not None}
+    get_search_backend().index_articles(article_pks)
+    bump_article_versions(article_pks)
+    Tag.objects.filter(pk__in=[pk for pk in tag_pks if pk is not None]).refresh_article_counts()
+    refresh_related_on_commit(article_pks, tag_pks)
+
+
+@receiver(post_save, sender=ArticleTag)
+def save_article_tag(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Tag.objects.filter(pk=instance.tag_id).update(article_count=F('article_count') + 1)
+        get_search_backend().index_articles([instance.article_id])
+        bump_article_versions([instance.article_id])
+        refresh_related_on_commit([instance.article_id], [instance.tag_id])
+        return
+    loaded_article_id, loaded_tag_id = getattr(instance, '_loaded_pair', (None, None))
+    article_tags_changed([instance.article_id, loaded_article_id], [instance.tag_id, loaded_tag_id])
+
+
+@receiver(post_delete, sender=ArticleTag)
+def delete_article_tag(sender, instance, **kwargs):
+    Tag.objects.filter(pk=instance.tag_id).update(article_count=Greatest(F('article_count') - 1, Value(0)))
+    get_search_backend().index_articles([instance.article_id])
+    bump_article_versions([instance.article_id])
+    refresh_related_on_commit([instance.article_id], [instance.tag_id])
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def change_article_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    """Article.tags.add()/remove()/set()/clear() write ArticleTag rows without post_save/post_delete."""
+    if action == 'pre_clear':
+        related = instance.article_tags if not reverse else instance.tag_articles
+        instance._cleared_pks = set(related.values_list('article_id' if reverse else 'tag_id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_cleared_pks', set())
+    if reverse:
+        article_tags_changed(pk_set, [instance.pk])
+    else:
+        article_tags_changed([instance.pk], pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def index_tag_articles(sender, instance, created, **kwargs):
+    if not created:
+        article_pks = list(instance.tag_articles.values_list('article_id', flat=True))
+        get_search_backend().index_articles(article_pks)
+        bump_article_versions(article_pks)
+
+
+@receiver(post_save, sender=Author)
+def index_author_articles(sender, instance, created, **kwargs):
+    if not created:
+        article_pks = list(instance.articles.values_list('pk', flat=True))
+        get_search_backend().index_articles(article_pks)
+        commented = instance.comments.order_by().values_list('article_id', flat=True).distinct()
+        bump_article_versions(set(article_pks) | set(commented))
+        latest_comments.invalidate()
+
+
+@receiver(post_save, sender=Category)
+def invalidate_category_articles(sender, instance, created, **kwargs):
+    if not created:
+        bump_article_versions(instance.articles.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_article(sender, instance, **kwargs):
+    bump_article_versions({instance.article_id, getattr(instance, '_loaded_article_id', None)})
+    latest_comments.invalidate()
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        Article.objects.filter(pk=instance.article_id).update(
+            comment_count=F('comment_count') + 1,
+            last_commented_at=instance.created_at,
+        )
+        return
+    loaded_article_id = getattr(instance, '_loaded_article_id', None)
+    if loaded_article_id is not None and loaded_article_id != instance.article_id:
+        Article.objects.filter(pk__in=[loaded_article_id, instance.article_id]).refresh_comment_stats()
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    latest = Comment.objects.filter(article=OuterRef('pk')).order_by('-created_at').values('created_at')[:1]
+    Article.objects.filter(pk=instance.article_id).update(
+        comment_count=Greatest(F('comment_count') - 1, Value(0)),
+        last_commented_at=Subquery(latest),
+    )
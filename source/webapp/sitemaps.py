@@ -0,0 +1,32 @@
+from django.contrib.sitemaps import Sitemap
+from django.shortcuts import reverse
+from webapp.models import Article
+
+
+class ArticleSitemap(Sitemap):
+    changefreq = 'weekly'
+
+    def items(self):
+        return Article.objects.order_by('pk').values('id', 'updated_at', 'last_commented_at')
+
+    def location(self, item):
+        return reverse('article_view', kwargs={'pk': item['id']})
+
+    def lastmod(self, item):
+        return max(filter(None, [item['updated_at'], item['last_commented_at']]))
+
+
+class ListingSitemap(Sitemap):
+    changefreq = 'hourly'
+
+    def items(self):
+        return ['index', 'article_trending', 'tag_index', 'archive_index']
+
+    def location(self, item):
+        return reverse(item)
+
+
+SITEMAPS = {
+    'pages': ListingSitemap,
+    'articles': ArticleSitemap,
+}
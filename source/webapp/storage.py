@@ -0,0 +1,83 @@
+import gzip
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map', '.xml')
+
+# Variants have to be at least this much smaller than the file to be worth serving.
+MIN_COMPRESSION_RATIO = 0.95
+
+
+CSS_STRING_OR_COMMENT = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/''', re.S)
+
+
+def minify_css(css):
+    """Drops comments and the whitespace around braces, semicolons and commas; strings are left alone.
+
+    Whitespace elsewhere can be significant (".nav :hover" is not ".nav:hover") and is only collapsed.
+    """
+    strings = []
+
+    def hide(match):
+        if match.group(1) is None:
+            return ' '
+        strings.append(match.group(1))
+        return '\0{}\0'.format(len(strings) - 1)
+
+    css = CSS_STRING_OR_COMMENT.sub(hide, css)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r' ?([{};,]) ?', r'\1', css)
+    css = css.replace(';}', '}').strip()
+    return re.sub('\0(\\d+)\0', lambda match: strings[int(match.group(1))], css)
+
+
+def compressed_variants(content):
+    """(suffix, bytes) pairs of the gzip and, when the brotli package is installed, brotli encodings."""
+    variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(content, quality=11)))
+    return [(suffix, data) for suffix, data in variants if len(data) < len(content) * MIN_COMPRESSION_RATIO]
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also minifies CSS before hashing and writes .gz/.br next to hashed files.
+
+    Used by collectstatic; webapp.middleware.StaticFilesMiddleware serves the result.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        for name in paths:
+            if name.endswith('.css') and not name.endswith('.min.css'):
+                self.minify(name)
+                paths[name] = (self, name)
+
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            yield name, hashed_name, processed
+
+        for name, hashed_name in self.hashed_files.items():
+            if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(hashed_name)
+
+    def minify(self, name):
+        with self.open(name) as file:
+            css = file.read().decode('utf-8')
+        self.delete(name)
+        self._save(name, ContentFile(minify_css(css).encode('utf-8')))
+
+    def compress(self, name):
+        with self.open(name) as file:
+            content = file.read()
+        for suffix, data in compressed_variants(content):
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(data))
@@ -0,0 +1,35 @@
+import os
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.loaders.cached import Loader as CachedLoader
+from django.template.utils import get_app_template_dirs
+
+
+def template_names(engine):
+    """Relative names of every .html template found in the engine's DIRS and app template directories."""
+    directories = list(engine.dirs)
+    if engine.app_dirs or any('app_directories' in str(loader) for loader in engine.loaders):
+        directories += list(get_app_template_dirs('templates'))
+    names = set()
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for file in files:
+                if file.endswith('.html'):
+                    names.add(os.path.relpath(os.path.join(root, file), directory).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def warm_template_cache():
+    """Compiles every template up front for engines using the cached loader, so no request pays for it."""
+    compiled = 0
+    for backend in engines.all():
+        engine = getattr(backend, 'engine', None)
+        if engine is None or not any(isinstance(loader, CachedLoader) for loader in engine.template_loaders):
+            continue
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError):
+                continue
+            compiled += 1
+    return compiled
@@ -1,3 +1,1040 @@
-from django.test import TestCase
+import asyncio
+import base64
+import gzip
+import json
+import os
+import tempfile
+import threading
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.models import Sum
+from django.template import engines
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from webapp.archive import get_archive_months
+from webapp.buffers import PENDING_SESSION_KEY, ArticleViewBuffer, BackgroundBuffer, flush_pending_comments,\
+                           get_view_buffer
+from webapp.cache import article_changed_key, get_article_page, latest_comments
+from webapp.middleware import StaticFilesMiddleware, stats
+from webapp.models import EXCERPT_LENGTH, Article, ArticleMonth, Author, Comment, Category, Tag, ArticleTag,\
+                          RelatedArticle, make_excerpt
+from webapp.pagination import NEXT, PREVIOUS, CursorPaginator, decode_cursor, encode_cursor
+from webapp.related import rebuild_related, refresh_related
+from webapp.routers import ReadOnlyRouter
+from webapp.search import FTS_TABLE, get_search_backend
+from webapp.seeding import explicit_timestamps
+from webapp.storage import compressed_variants, minify_css
+from webapp.templating import template_names, warm_template_cache
+from webapp.transfer import COLUMNS, Importer, export_rows, read_ndjson
+
+
+class QueryCountMixin:
+    """Asserts that rendering a page costs the same number of queries however many rows it shows."""
+
+    def assertPageQueries(self, num, url, data=None):
+        with self.assertNumQueries(num):
+            response = self.client.get(url, data)
+            self.assertEqual(response.status_code, 200)
+        return response
+
+
+class ListQueryCountTest(QueryCountMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tags = [Tag.objects.create(name='tag{}'.format(i)) for i in range(3)]
+        for i in range(10):
+            category = Category.objects.create(name='category{}'.format(i))
+            article = Article.objects.create(title='Article {}'.format(i), text='Text', category=category)
+            for tag in tags:
+                ArticleTag.objects.create(article=article, tag=tag)
+            for j in range(5):
+                Comment.objects.create(article=article, text='Comment {}'.format(j))
+        cls.article = article
+
+    def setUp(self):
+        cache.clear()
+
+    def test_article_index(self):
+        # count, page, prefetched tags, archive months until cached
+        self.assertPageQueries(4, reverse('index'))
+        self.assertPageQueries(3, reverse('index'), {'page': 2})
+
+    def test_article_index_cursor(self):
+        # page, prefetched tags
+        get_archive_months()
+        self.assertPageQueries(2, reverse('index'), {'cursor': ''})
+
+    def test_comment_index(self):
+        # count, page with articles joined
+        self.assertPageQueries(2, reverse('comment_index'))
+        self.assertPageQueries(1, reverse('comment_index'), {'cursor': ''})
+
+    def test_article_view(self):
+        # article with category, tags, related articles, comment count, comment page
+        self.assertPageQueries(5, reverse('article_view', kwargs={'pk': self.article.pk}))
+        self.assertPageQueries(4, reverse('article_view', kwargs={'pk': self.article.pk}), {'cursor': ''})
+
+    def test_article_view_cached(self):
+        url = reverse('article_view', kwargs={'pk': self.article.pk})
+        self.client.get(url)
+        self.assertPageQueries(1, url)
+
+
+class CursorPaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for i in range(8):
+            article = Article.objects.create(title='Article {}'.format(i), text='Text')
+            # Three groups of articles sharing a created_at, so pages split ties.
+            Article.objects.filter(pk=article.pk).update(created_at=now - timedelta(hours=i // 3))
+        cls.expected = list(Article.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+
+    def walk(self, per_page):
+        paginator = CursorPaginator(Article.objects.all(), per_page)
+        pages = [paginator.get_page(None)]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return paginator, pages
+
+    def pks(self, page):
+        return [article.pk for article in page]
+
+    def test_pages_split_ties(self):
+        for per_page in (1, 2, 3, 5, 8):
+            pages = self.walk(per_page)[1]
+            self.assertEqual([pk for page in pages for pk in self.pks(page)], self.expected)
+            self.assertFalse(pages[0].has_previous())
+            self.assertEqual(len(pages), -(-len(self.expected) // per_page))
+
+    def test_previous_returns_same_pages(self):
+        paginator, pages = self.walk(3)
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            self.assertTrue(page.has_previous())
+            page = paginator.get_page(page.previous_cursor)
+            self.assertEqual(self.pks(page), self.pks(expected))
+            self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+        self.assertEqual(self.pks(paginator.get_page(page.next_cursor)), self.pks(pages[1]))
+
+    def test_malformed_cursors(self):
+        position = encode_cursor(Article.objects.first(), NEXT)
+        self.assertEqual(decode_cursor(position)[2], NEXT)
+
+        def token(value):
+            return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+        for cursor in ('broken', '%%%', position[:-3], token(['2020-01-01T00:00:00', 1]),
+                       token(['not a date', 1, NEXT]), token(['2020-01-01T00:00:00', '1', NEXT]),
+                       token(['2020-01-01T00:00:00', 1, 'x']), token({'created_at': 1})):
+            self.assertIsNone(decode_cursor(cursor), cursor)
+            # The index falls back to its first page.
+            response = self.client.get(reverse('index'), {'cursor': cursor})
+            self.assertEqual(self.pks(response.context['articles']), self.expected[:4])
+            self.assertFalse(response.context['page_obj'].has_previous())
+
+    def test_index_links(self):
+        response = self.client.get(reverse('index'), {'cursor': ''})
+        pks = self.pks(response.context['articles'])
+        while response.context['page_obj'].has_next():
+            response = self.client.get(reverse('index'), {'cursor': response.context['page_obj'].next_cursor})
+            pks += self.pks(response.context['articles'])
+        self.assertEqual(pks, self.expected)
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.mentioned = Article.objects.create(title='Release notes', text='Ported the parser from python two. ' * 20)
+        self.about = Article.objects.create(title='Python tips', text='Python generators and python decorators.')
+        self.tagged = Article.objects.create(title='Weekly links', text='Nothing to see',
+                                             author=Author.objects.create(name='Guido'))
+        self.tagged.tags.add(Tag.objects.create(name='pythonic'))
+        Article.objects.create(title='Gardening', text='Tomatoes')
+
+    def search(self, query, **params):
+        response = self.client.get(reverse('index'), dict(params, search=query))
+        return [article.title for article in response.context['articles']]
+
+    def test_ranked_prefix_search(self):
+        self.assertEqual(self.search('python')[0], 'Python tips')
+        self.assertEqual(self.search('python', cursor='')[0], 'Python tips')
+        self.assertEqual(set(self.search('pyth')), {'Python tips', 'Release notes', 'Weekly links'})
+        self.assertEqual(self.search('guido'), ['Weekly links'])
+        self.assertEqual(self.search('tomato'), ['Gardening'])
+
+    def test_index_follows_edits(self):
+        self.about.title = 'Ruby tips'
+        self.about.save()
+        self.assertEqual(self.search('ruby'), ['Ruby tips'])
+        self.tagged.tags.clear()
+        self.assertNotIn('Weekly links', self.search('pythonic'))
+        self.mentioned.delete()
+        self.assertEqual(self.search('parser'), [])
+
+    @override_settings(SEARCH_BACKEND='webapp.search.SimpleSearchBackend')
+    def test_simple_backend(self):
+        self.assertEqual(set(self.search('python')), {'Python tips', 'Release notes', 'Weekly links'})
+        self.assertEqual(self.search('guido'), ['Weekly links'])
+        self.assertEqual(self.search('python tips'), ['Python tips'])
+
+
+class ArticleExcerptTest(TestCase):
+    def test_index_shows_excerpt_only(self):
+        text = 'First sentence of the article. ' + 'More words here. ' * 100 + 'The hidden ending.'
+        article = Article.objects.create(title='Long', text=text)
+        self.assertEqual(article.excerpt, make_excerpt(text))
+        self.assertLessEqual(len(article.excerpt), EXCERPT_LENGTH)
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, article.excerpt)
+        self.assertNotContains(response, 'The hidden ending.')
+        self.assertEqual(response.context['articles'][0].get_deferred_fields(), {'text'})
+        self.assertContains(self.client.get(reverse('article_view', kwargs={'pk': article.pk})), 'The hidden ending.')
+
+    def test_excerpt_follows_text(self):
+        article = Article.objects.create(title='Short', text='Old text')
+        article.text = 'New text'
+        article.save(update_fields=['text'])
+        article.refresh_from_db()
+        self.assertEqual(article.excerpt, 'New text')
+        self.assertEqual(make_excerpt('word ' * 100), ('word ' * 40).strip() + '…')
+
+
+class ArticlePageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.article = Article.objects.create(title='Article', text='Text')
+        self.other = Article.objects.create(title='Other', text='Text')
+        self.url = reverse('article_view', kwargs={'pk': self.article.pk})
+        self.client.get(self.url)
+
+    def test_comment_for_article_shows_immediately(self):
+        self.client.post(reverse('article_comment_add', kwargs={'pk': self.article.pk}),
+                         {'author': 'Reader', 'text': 'First!'})
+        self.assertContains(self.client.get(self.url), 'First!')
+
+    def test_comment_moved_to_other_article(self):
+        comment = Comment.objects.create(article=self.article, text='Moving comment')
+        self.assertContains(self.client.get(self.url), 'Moving comment')
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.article = self.other
+        comment.save()
+        self.assertNotContains(self.client.get(self.url), 'Moving comment')
+
+    def test_tag_changes(self):
+        tag = Tag.objects.create(name='python')
+        ArticleTag.objects.create(article=self.article, tag=tag)
+        self.assertContains(self.client.get(self.url), 'python')
+        tag.name = 'django'
+        tag.save()
+        self.assertContains(self.client.get(self.url), 'django')
+
+    def test_page_keys_are_normalized(self):
+        for i in range(4):
+            Comment.objects.create(article=self.article, text='Comment {}'.format(i))
+        cache.clear()
+        with mock.patch('webapp.views.article_views.get_article_page', wraps=get_article_page) as get_page:
+            for page in ('1', '01', 'junk', '0', '2', '999', '-1'):
+                self.client.get(self.url, {'page': page})
+            for cursor in ('', 'junk'):
+                self.client.get(self.url, {'cursor': cursor})
+        self.assertEqual({call[0][1] for call in get_page.call_args_list}, {'page:1', 'page:2', 'cursor:'})
+        self.assertContains(self.client.get(self.url, {'page': '999'}), 'Comment 0')
+
+
+class CommentCounterTest(TestCase):
+    def setUp(self):
+        self.article = Article.objects.create(title='Article', text='Text')
+        self.other = Article.objects.create(title='Other', text='Text')
+
+    def assertStats(self, article, count, last_comment):
+        article.refresh_from_db()
+        self.assertEqual(article.comment_count, count)
+        self.assertEqual(article.last_commented_at, last_comment.created_at if last_comment else None)
+
+    def test_views_maintain_counters(self):
+        self.client.post(reverse('article_comment_add', kwargs={'pk': self.article.pk}), {'text': 'One'})
+        self.client.post(reverse('comment_add'), {'article': self.article.pk, 'text': 'Two'})
+        first, second = Comment.objects.order_by('pk')
+        self.assertStats(self.article, 2, second)
+        self.client.get(reverse('comment_delete', kwargs={'pk': second.pk}))
+        self.assertStats(self.article, 1, first)
+
+    def test_moving_comment_and_recount(self):
+        comment = Comment.objects.create(article=self.article, text='Moving')
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.article = self.other
+        comment.save()
+        self.assertStats(self.article, 0, None)
+        self.assertStats(self.other, 1, comment)
+        Article.objects.update(comment_count=7)
+        call_command('refresh_counters', stdout=StringIO())
+        self.assertStats(self.article, 0, None)
+        self.assertStats(self.other, 1, comment)
+
+
+
+class TagCountTest(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.python = Tag.objects.create(name='python')
+        self.django = Tag.objects.create(name='django')
+        self.article = Article.objects.create(title='Article', text='Text')
+
+    def assertCounts(self, python, django):
+        self.assertEqual(Tag.objects.get(pk=self.python.pk).article_count, python)
+        self.assertEqual(Tag.objects.get(pk=self.django.pk).article_count, django)
+
+    def test_counts_follow_tagging(self):
+        link = ArticleTag.objects.create(article=self.article, tag=self.python)
+        self.assertCounts(1, 0)
+        self.article.tags.set([self.django])
+        self.assertCounts(0, 1)
+        self.python.articles.add(self.article)
+        self.assertCounts(1, 1)
+        self.article.tags.clear()
+        self.assertCounts(0, 0)
+        link = ArticleTag.objects.create(article=self.article, tag=self.python)
+        link.delete()
+        self.assertCounts(0, 0)
+        Tag.objects.update(article_count=5)
+        call_command('refresh_counters', stdout=StringIO())
+        self.assertCounts(0, 0)
+
+    def test_tag_pages(self):
+        self.article.tags.set([self.python])
+        response = self.assertPageQueries(1, reverse('tag_index'))
+        self.assertContains(response, 'python')
+        self.assertNotContains(response, 'django')
+        response = self.client.get(reverse('tag_articles', kwargs={'pk': self.python.pk}))
+        self.assertEqual(list(response.context['articles']), [self.article])
+        response = self.client.get(reverse('tag_articles', kwargs={'pk': self.django.pk}))
+        self.assertEqual(list(response.context['articles']), [])
+
+@override_settings(COMMENT_WRITE_BUFFER={'ENABLED': True, 'BATCH_SIZE': 100, 'FLUSH_INTERVAL': 3600})
+class CommentWriteBufferTest(TestCase):
+    def setUp(self):
+        self.article = Article.objects.create(title='Article', text='Text')
+        self.url = reverse('article_view', kwargs={'pk': self.article.pk})
+
+    def test_author_reads_own_comment(self):
+        response = self.client.post(reverse('article_comment_add', kwargs={'pk': self.article.pk}), {'text': 'Queued'})
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        self.assertFalse(Comment.objects.exists())
+        self.assertContains(self.client.get(self.url), 'Queued')
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 1)
+
+    def test_article_views_leave_sessions_alone(self):
+        request = RequestFactory().get(self.url)
+        request.session = SessionStore()
+        flush_pending_comments(request, self.article.pk)
+        self.assertFalse(request.session.accessed)
+        self.client.post(reverse('article_comment_add', kwargs={'pk': self.article.pk}), {'text': 'Queued'})
+        with mock.patch.object(SessionStore, 'save', autospec=True, side_effect=SessionStore.save) as save:
+            self.client.get(self.url)
+            self.assertEqual(save.call_count, 1)
+            self.assertNotIn(PENDING_SESSION_KEY, self.client.session)
+            self.client.get(self.url)
+            self.assertEqual(save.call_count, 1)
+
+    def test_missing_article(self):
+        response = self.client.post(reverse('article_comment_add', kwargs={'pk': self.article.pk + 1}), {'text': 'Lost'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_flush_thread_survives_errors(self):
+        flushed = threading.Event()
+
+        class FlakyBuffer(BackgroundBuffer):
+            failures = 1
+
+            def flush(self):
+                if self.failures:
+                    self.failures -= 1
+                    raise ValueError('Broken batch')
+                flushed.set()
+
+        flaky = FlakyBuffer(flush_interval=0.01)
+        with self.assertLogs('webapp.buffers', 'ERROR'):
+            flaky.start()
+            self.assertTrue(flushed.wait(5))
+        flaky.close()
+
+
+class ArticleViewBufferTest(TestCase):
+    def setUp(self):
+        self.articles = [Article.objects.create(title='Article {}'.format(i), text='Text') for i in range(3)]
+
+    def test_views_are_batched_and_decay(self):
+        view_buffer = ArticleViewBuffer(flush_interval=3600, half_life=3600)
+        now = timezone.now()
+        for _ in range(3):
+            view_buffer.hits[self.articles[0].pk] += 1
+        view_buffer.hits[self.articles[1].pk] += 1
+        with CaptureQueriesContext(connection) as captured:
+            view_buffer.write(view_buffer.hits, now - timedelta(hours=2))
+        self.assertEqual(sum(query['sql'].startswith('UPDATE') for query in captured.captured_queries), 2)
+        view_buffer.write({self.articles[2].pk: 1}, now)
+        self.articles[0].refresh_from_db()
+        self.assertEqual(self.articles[0].view_count, 3)
+        # Three views two half-lives ago weigh less than one view now.
+        response = self.client.get(reverse('article_trending'))
+        self.assertEqual(list(response.context['articles']), [self.articles[2], self.articles[0], self.articles[1]])
+
+    def test_article_page_counts_views(self):
+        options = {'ENABLED': True, 'FLUSH_INTERVAL': 3600, 'HALF_LIFE': 3600}
+        with self.settings(ARTICLE_VIEW_BUFFER=options):
+            view_buffer = get_view_buffer()
+            with CaptureQueriesContext(connection) as captured:
+                self.client.get(reverse('article_view', kwargs={'pk': self.articles[0].pk}))
+            self.assertTrue(all(query['sql'].startswith('SELECT') for query in captured.captured_queries))
+            self.client.get(reverse('article_view', kwargs={'pk': self.articles[0].pk}))
+            self.assertEqual(view_buffer.hits[self.articles[0].pk], 2)
+            view_buffer.flush()
+        self.articles[0].refresh_from_db()
+        self.assertEqual(self.articles[0].view_count, 2)
+
+
+class RelatedArticlesTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.python, self.django = Tag.objects.create(name='python'), Tag.objects.create(name='django')
+        self.article, self.both, self.one, self.none = [
+            Article.objects.create(title='Article {}'.format(i), text='Text') for i in range(4)]
+        self.article.tags.add(self.python, self.django)
+        self.both.tags.add(self.python, self.django)
+        self.one.tags.add(self.python)
+
+    def related(self, article):
+        url = reverse('article_view', kwargs={'pk': article.pk})
+        return [link.related for link in self.client.get(url).context['related_articles']]
+
+    def test_refreshed_when_tags_change(self):
+        self.assertEqual(self.related(self.article), [self.both, self.one])
+        self.none.tags.add(self.python, self.django)
+        self.assertEqual(self.related(self.article), [self.none, self.both, self.one])
+        self.both.delete()
+        self.assertEqual(self.related(self.article), [self.none, self.one])
+        self.assertEqual(self.related(self.one), [self.none, self.article])
+
+    def test_linking_pages_show_renamed_articles(self):
+        url = reverse('article_view', kwargs={'pk': self.article.pk})
+        self.assertContains(self.client.get(url), 'Article 1')
+        self.both.title = 'Saved title'
+        self.both.save()
+        self.assertContains(self.client.get(url), 'Saved title')
+        edit_url = reverse('article_update', kwargs={'pk': self.both.pk})
+        form = self.client.get(edit_url).context['form']
+        data = {name: form[name].value() for name in form.fields if form[name].value() is not None}
+        data.update(title='Edited title', tags=[self.python.pk, self.django.pk])
+        self.assertEqual(self.client.post(edit_url, data).status_code, 302)
+        self.assertContains(self.client.get(url), 'Edited title')
+        self.both.delete()
+        self.assertNotContains(self.client.get(url), 'Edited title')
+
+    def test_popular_tag_refresh_is_incremental(self):
+        popular = Tag.objects.create(name='popular')
+        crowd = [Article.objects.create(title='Crowd {}'.format(i), text='Text') for i in range(12)]
+        for article in crowd:
+            article.tags.add(popular)
+        with mock.patch('webapp.related.refresh_related', wraps=refresh_related) as refresh:
+            self.one.tags.add(popular)
+            crowd[-1].tags.add(self.python)
+        self.assertEqual(refresh.call_args_list[0][0][0], {self.one.pk})
+        self.assertLess(len(refresh.call_args_list[1][0][0]), len(crowd))
+        self.assertEqual(rebuild_related(), 0)
+        crowd[-1].tags.remove(self.python)
+        self.one.tags.remove(popular)
+        self.assertEqual(rebuild_related(), 0)
+
+    def test_rebuild_command(self):
+        RelatedArticle.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_related', stdout=out)
+        self.assertIn('Updated related articles of 3 articles', out.getvalue())
+        self.assertEqual(self.related(self.one), [self.both, self.article])
+
+
+class ArchiveTest(QueryCountMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        with explicit_timestamps(Article):
+            for created_at in ['2026-01-31T23:00:00+00:00', '2026-01-05T10:00:00+00:00',
+                               '2026-03-01T00:00:00+00:00', '2025-12-31T23:59:59+00:00']:
+                Article.objects.create(title=created_at, text='Text', created_at=parse_datetime(created_at),
+                                       updated_at=parse_datetime(created_at))
+
+    def test_monthly_counts_are_maintained(self):
+        self.assertEqual(get_archive_months(), [(date(2026, 3, 1), 1), (date(2026, 1, 1), 2), (date(2025, 12, 1), 1)])
+        Article.objects.filter(created_at__month=3).get().delete()
+        self.assertEqual(get_archive_months(), [(date(2026, 1, 1), 2), (date(2025, 12, 1), 1)])
+        ArticleMonth.objects.all().delete()
+        call_command('refresh_counters', stdout=StringIO())
+        self.assertEqual(get_archive_months(), [(date(2026, 1, 1), 2), (date(2025, 12, 1), 1)])
+
+    def test_archive_pages(self):
+        response = self.assertPageQueries(4, reverse('archive_month', kwargs={'year': 2026, 'month': 1}))
+        self.assertEqual([article.title for article in response.context['articles']],
+                         ['2026-01-31T23:00:00+00:00', '2026-01-05T10:00:00+00:00'])
+        self.assertEqual(response.context['older_month'], date(2025, 12, 1))
+        self.assertEqual(response.context['newer_month'], date(2026, 3, 1))
+        response = self.client.get(reverse('archive_year', kwargs={'year': 2026}))
+        self.assertEqual(len(response.context['articles']), 3)
+        self.assertContains(self.client.get(reverse('archive_index')), 'January')
+        for kwargs in [{'year': 2026, 'month': 13}, {'year': 0}, {'year': 99999}, {'year': 9999, 'month': 12}]:
+            response = self.client.get(reverse('archive_month' if 'month' in kwargs else 'archive_year', kwargs=kwargs))
+            self.assertEqual(response.status_code, 404)
+
+
+class AuthorTest(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.anna = Author.objects.create(name='Anna Lee')
+        for i in range(5):
+            Article.objects.create(title='Article {}'.format(i), text='Text', author=self.anna)
+        Article.objects.create(title='Other', text='Text')
+
+    def test_author_page(self):
+        # author, count, page with authors and categories joined, prefetched tags
+        get_archive_months()
+        response = self.assertPageQueries(4, reverse('author_articles', kwargs={'pk': self.anna.pk}))
+        self.assertEqual(response.context['paginator'].count, 5)
+        self.assertContains(response, 'Articles by Anna Lee')
+        self.assertEqual(Article.objects.get(title='Other').author.name, 'Unknown')
+
+    def test_forms_reuse_authors_by_name(self):
+        article = Article.objects.get(title='Other')
+        url = reverse('article_comment_add', kwargs={'pk': article.pk})
+        self.client.post(url, {'author': ' Anna   Lee ', 'text': 'Hi'})
+        self.client.post(url, {'author': '', 'text': 'Hi'})
+        authors = Comment.objects.order_by('pk').values_list('author__name', flat=True)
+        self.assertEqual(list(authors), ['Anna Lee', None])
+        self.assertEqual(Author.objects.count(), 2)
+        response = self.client.get(reverse('api_article_comments', kwargs={'pk': article.pk}))
+        self.assertEqual([comment['author'] for comment in response.json()['results']], ['Anonymous', 'Anna Lee'])
+
+    def test_authors_are_only_written_by_valid_forms(self):
+        with self.assertNumQueries(0):
+            Article()
+        self.client.get(reverse('article_add'))
+        self.client.post(reverse('article_comment_add', kwargs={'pk': self.anna.articles.first().pk}),
+                         {'author': 'Bob', 'text': ''})
+        self.assertFalse(Author.objects.filter(name='Bob').exists())
+
+    def test_import_blank_author(self):
+        importer = Importer()
+        importer.add('article', {'id': 100, 'title': 'Imported', 'text': 'Text', 'author': '   '})
+        importer.finish()
+        self.assertEqual(Article.objects.get(pk=100).author.name, 'Unknown')
+
+
+class TransferTest(TestCase):
+    def setUp(self):
+        news = Category.objects.create(name='News')
+        python = Tag.objects.create(name='python')
+        anna = Author.objects.create(name='Anna')
+        first = Article.objects.create(title='First', text='Text', author=anna, category=news)
+        second = Article.objects.create(title='Second', text='Más texto', author=anna)
+        ArticleTag.objects.create(article=first, tag=python)
+        ArticleTag.objects.create(article=second, tag=Tag.objects.create(name='django'))
+        Comment.objects.create(article=first, text='Hi', author=anna)
+        Comment.objects.create(article=first, text='Anonymous hi')
+        Comment.objects.create(article=second, text='Hello')
+
+    def snapshot(self):
+        # Categories and tags are matched by name, so their ids may change.
+        return {name: [{column: value for column, value in row.items() if name in ('article', 'comment')
+                        or column != 'id'} for row in export_rows(name)] for name in COLUMNS}
+
+    def clear(self):
+        Article.objects.all().delete()
+        for model in (Author, Category, Tag):
+            model.objects.all().delete()
+
+    def round_trip(self, export_args, import_args):
+        expected = self.snapshot()
+        comment_counts = list(Article.objects.order_by('pk').values_list('comment_count', flat=True))
+        call_command('export_data', *export_args, stdout=StringIO())
+        self.clear()
+        call_command('import_data', *import_args, stdout=StringIO())
+        self.assertEqual(self.snapshot(), expected)
+        self.assertEqual(list(Article.objects.order_by('pk').values_list('comment_count', flat=True)),
+                         comment_counts)
+        self.assertEqual(dict(Tag.objects.values_list('name', 'article_count')), {'python': 1, 'django': 1})
+
+    def test_ndjson_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.ndjson')
+            self.round_trip([path], [path, '--batch-size', '1'])
+
+    def test_csv_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.round_trip([directory, '--format', 'csv'], [directory, '--format', 'csv'])
+
+    def test_counts_only_inserted_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.ndjson')
+            call_command('export_data', path, stdout=StringIO())
+            Comment.objects.filter(text='Hello').delete()
+            importer = Importer(ignore_conflicts=True)
+            with open(path, encoding='utf-8') as stream:
+                for name, row in read_ndjson(stream):
+                    importer.add(name, row)
+            importer.finish()
+        self.assertEqual(importer.counts, {'category': 0, 'tag': 0, 'article': 0, 'articletag': 0, 'comment': 1})
+        self.assertEqual(Comment.objects.count(), 3)
+
+    def test_duplicate_category_names(self):
+        news = Category.objects.get(name='News')
+        Category.objects.create(name='News')
+        importer = Importer()
+        importer.add('article', {'id': 100, 'title': 'Imported', 'text': 'Text', 'author': 'Anna', 'category': 'News'})
+        importer.finish()
+        self.assertEqual(Article.objects.get(pk=100).category, news)
+        self.assertEqual(importer.counts['category'], 0)
+
+
+class SeedDataTest(TestCase):
+    def test_seed_data(self):
+        call_command('seed_data', '--articles', '6', '--comments', '30', '--categories', '2', '--tags', '4',
+                     '--hot-share', '0.5', '--batch-size', '4', '--seed', '1', stdout=StringIO())
+        self.assertEqual((Article.objects.count(), Comment.objects.count()), (6, 30))
+        self.assertEqual((Category.objects.count(), Tag.objects.count()), (2, 4))
+        for article in Article.objects.all():
+            comments = article.comments.order_by('created_at')
+            self.assertEqual(article.comment_count, comments.count())
+            self.assertEqual(article.tags.count(), 3)
+            self.assertTrue(all(comment.created_at >= article.created_at for comment in comments))
+        for tag in Tag.objects.all():
+            self.assertEqual(tag.article_count, tag.articles.count())
+        self.assertEqual(ArticleMonth.objects.aggregate(total=Sum('article_count'))['total'], 6)
+        self.assertEqual(self.client.get(reverse('index')).status_code, 200)
+
+        call_command('seed_data', '--articles', '2', '--comments', '0', '--categories', '0', '--tags', '0',
+                     stdout=StringIO())
+        self.assertEqual(Article.objects.count(), 8)
+
+
+@override_settings(DATABASE_ROUTERS=['webapp.routers.ReadOnlyRouter'])
+class ReadOnlyDatabaseTest(TestCase):
+    def setUp(self):
+        self.article = Article.objects.create(title='Article', text='Text')
+
+    def read_aliases(self, method, url, data=None):
+        """Databases the router picks for the reads of a request, as if 'readonly' were configured."""
+        aliases = set()
+        route = ReadOnlyRouter.db_for_read
+
+        def record(router, model, **hints):
+            aliases.add(route(router, model, **hints))
+            return 'default'
+        with mock.patch('webapp.routers.settings', DATABASES={'default': {}, 'readonly': {}}), \
+                mock.patch.object(ReadOnlyRouter, 'db_for_read', autospec=True, side_effect=record):
+            getattr(self.client, method)(url, data)
+        return aliases
+
+    def test_read_views_use_readonly(self):
+        self.assertEqual(self.read_aliases('get', reverse('index')), {'readonly'})
+        self.assertEqual(self.read_aliases('get', reverse('article_view', kwargs={'pk': self.article.pk})),
+                         {'readonly'})
+        self.assertEqual(self.read_aliases('post', reverse('article_comment_add', kwargs={'pk': self.article.pk}),
+                                           {'author': 'Anna', 'text': 'Hi'}), {'default'})
+        self.assertEqual(ReadOnlyRouter().db_for_read(Article), 'default')
+        self.assertEqual(ReadOnlyRouter().db_for_write(Article), 'default')
+
+    @override_settings(SQLITE_PRAGMAS={'readonly': {'query_only': 'ON', 'cache_size': -1234}})
+    def test_sqlite_pragmas(self):
+        readonly = connection.copy('readonly')
+        try:
+            with readonly.cursor() as cursor:
+                cursor.execute('PRAGMA query_only')
+                self.assertEqual(cursor.fetchone()[0], 1)
+                cursor.execute('PRAGMA cache_size')
+                self.assertEqual(cursor.fetchone()[0], -1234)
+                with self.assertRaises(OperationalError):
+                    cursor.execute('CREATE TABLE readonly_check (id integer)')
+        finally:
+            readonly.close()
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA query_only')
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+
+@override_settings(READ_CONCURRENCY=2)
+class ConcurrentReadTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        tag = Tag.objects.create(name='python')
+        self.article = Article.objects.create(title='Article', text='Text')
+        self.article.tags.add(tag)
+        for i in range(10):
+            Article.objects.create(title='Other {}'.format(i), text='Text')
+            Comment.objects.create(article=self.article, text='Comment {}'.format(i))
+
+    def test_pages_match_sequential_rendering(self):
+        for url, data in [(reverse('index'), {'page': 3}), (reverse('comment_index'), {'page': 2}),
+                          (reverse('article_view', kwargs={'pk': self.article.pk}), {'page': 4})]:
+            concurrent = self.client.get(url, data)
+            cache.clear()
+            with self.settings(READ_CONCURRENCY=0):
+                sequential = self.client.get(url, data)
+            self.assertEqual(concurrent.status_code, 200)
+            self.assertEqual(list(concurrent.context['page_obj']), list(sequential.context['page_obj']))
+            self.assertEqual(concurrent.context['page_obj'].number, sequential.context['page_obj'].number)
+        response = self.client.get(reverse('article_view', kwargs={'pk': self.article.pk}))
+        self.assertContains(response, 'python')
+
+    def test_asgi_application(self):
+        from main.asgi import application
+        messages = [{'type': 'http.request', 'body': b''}]
+        sent = []
+
+        async def receive():
+            return messages.pop()
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': reverse('comment_index'), 'query_string': b'page=2',
+                 'headers': [(b'host', b'testserver')]}
+        asyncio.run(application(scope, receive, send))
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn(b'Comment 3', sent[1]['body'])
+
+
+class StaticAssetsTest(TestCase):
+    def test_minify_css(self):
+        css = '/* cards */\n.card a > b,\n.card i {\n    margin: 0 auto;\n    color: #222;\n}\n'
+        self.assertEqual(minify_css(css), '.card a > b,.card i{margin: 0 auto;color: #222}')
+        self.assertEqual(minify_css('.nav :hover { content: "a : b;}" ; }'), '.nav :hover{content: "a : b;}"}')
+
+    def test_static_files_middleware(self):
+        with tempfile.TemporaryDirectory() as root, self.settings(STATIC_ROOT=root):
+            with open(os.path.join(root, 'site.css'), 'w') as file:
+                file.write('body{margin:0}')
+            with open(os.path.join(root, 'site.css.br'), 'wb') as file:
+                file.write(b'brotli')
+            middleware = StaticFilesMiddleware(lambda request: None)
+            factory = RequestFactory()
+            response = middleware(factory.get('/static/site.css', HTTP_ACCEPT_ENCODING='gzip, br;q=0'))
+            self.assertNotIn('Content-Encoding', response)
+            response = middleware(factory.get('/static/site.css', HTTP_ACCEPT_ENCODING='gzip, br'))
+            self.assertEqual(response['Content-Encoding'], 'br')
+            response = middleware(factory.get('/static/site.css', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']))
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+            self.assertIn('max-age', response['Cache-Control'])
+
+    def test_compressed_variants(self):
+        content = b'body{margin:0}' * 100
+        variants = dict(compressed_variants(content))
+        self.assertEqual(gzip.decompress(variants['.gz']), content)
+        self.assertEqual(compressed_variants(b'x'), [])
+
+
+class TemplateWarmupTest(TestCase):
+    def test_cached_loader_is_warmed(self):
+        cached = dict(settings.TEMPLATES[0], APP_DIRS=False, OPTIONS=dict(settings.TEMPLATES[0]['OPTIONS'], loaders=[
+            ('django.template.loaders.cached.Loader', ['django.template.loaders.app_directories.Loader']),
+        ]))
+        with self.settings(TEMPLATES=[cached]):
+            self.assertIn('partial/pagination.html', template_names(engines['django'].engine))
+            self.assertGreater(warm_template_cache(), 0)
+            self.assertEqual(self.client.get(reverse('index')).status_code, 200)
+
+
+class CommentsSinceApiTest(TestCase):
+    def setUp(self):
+        latest_comments.invalidate()
+        self.article = Article.objects.create(title='Article', text='Text')
+        self.url = reverse('api_comments_since')
+
+    def test_polling(self):
+        for i in range(3):
+            Comment.objects.create(article=self.article, text='Comment {}'.format(i))
+        data = self.client.get(self.url).json()
+        self.assertEqual([comment['text'] for comment in data['results']], ['Comment 0', 'Comment 1', 'Comment 2'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url, {'cursor': data['cursor']}).json()['results'], [])
+        Comment.objects.create(article=self.article, text='Comment 3')
+        data = self.client.get(self.url, {'cursor': data['cursor']}).json()
+        self.assertEqual([comment['text'] for comment in data['results']], ['Comment 3'])
+        self.assertEqual(self.client.get(self.url, {'cursor': 'broken'}).status_code, 400)
+
+    def test_old_cursor_reads_database(self):
+        first = Comment.objects.create(article=self.article, text='First')
+        for i in range(3):
+            Comment.objects.create(article=self.article, text='Comment {}'.format(i))
+        latest_comments.size = 2
+        try:
+            data = self.client.get(self.url, {'cursor': encode_cursor(first, PREVIOUS), 'limit': 2}).json()
+        finally:
+            latest_comments.size = settings.COMMENT_FEED_SIZE
+        self.assertEqual([comment['text'] for comment in data['results']], ['Comment 0', 'Comment 1'])
+        self.assertTrue(data['has_more'])
+
+
+class OptimisticEditTest(TestCase):
+    def setUp(self):
+        self.article = Article.objects.create(title='Article', text='Text', author=Author.objects.create(name='Anna'))
+        self.url = reverse('article_update', kwargs={'pk': self.article.pk})
+
+    def edit_data(self, **changes):
+        form = self.client.get(self.url).context['form']
+        data = {name: form[name].value() for name in form.fields if form[name].value() is not None}
+        data['tags'] = []
+        data.update(changes)
+        return data
+
+    def test_only_changed_fields_are_written(self):
+        data = self.edit_data(title='Renamed')
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 302)
+        claim, update = [query['sql'] for query in captured.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertIn('SET "updated_at"', claim)
+        self.assertIn('"title"', update)
+        self.assertNotIn('"text"', update)
+        self.assertNotIn('"updated_at" =', update.split('WHERE')[0])
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.title, 'Renamed')
+        self.assertEqual(self.article.updated_at.isoformat(), self.edit_data()['version'])
+
+    def test_unchanged_form_writes_nothing(self):
+        updated_at = self.article.updated_at
+        self.client.post(self.url, self.edit_data())
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.updated_at, updated_at)
+
+    def test_version_is_required(self):
+        data = self.edit_data(title='Mine')
+        del data['version']
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'This form is out of date.')
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.title, 'Article')
+
+    def test_stale_edit_is_rejected(self):
+        data = self.edit_data(title='Mine')
+        Article.objects.get(pk=self.article.pk).save()
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 409)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.title, 'Article')
+
+
+class AdminModerationTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        self.category = Category.objects.create(name='news')
+        self.tag = Tag.objects.create(name='python')
+        self.articles = [Article.objects.create(title='Article {}'.format(i), text='Text') for i in range(3)]
+        for article in self.articles:
+            ArticleTag.objects.create(article=article, tag=self.tag)
+        Comment.objects.bulk_create([Comment(article=self.articles[0], text='Comment {}'.format(i)) for i in range(45)])
+        Article.objects.refresh_comment_stats()
+
+    def run_action(self, action, articles, **data):
+        url = reverse('admin:webapp_article_changelist')
+        data.update({'action': action, '_selected_action': [article.pk for article in articles]})
+        return self.client.post(url, data)
+
+    def test_set_based_actions(self):
+        self.run_action('set_category', self.articles[:2], category=self.category.pk)
+        self.assertEqual(Article.objects.filter(category=self.category).count(), 2)
+        self.run_action('remove_tag', self.articles[:2], tag=self.tag.pk)
+        self.assertEqual(Tag.objects.get(pk=self.tag.pk).article_count, 1)
+        self.run_action('add_tag', self.articles, tag=self.tag.pk)
+        self.assertEqual(Tag.objects.get(pk=self.tag.pk).article_count, 3)
+        response = self.run_action('delete_articles', self.articles[:1])
+        self.assertContains(response, '1 articles with their 45 comments')
+        self.assertTrue(Comment.objects.exists())
+        self.run_action('delete_articles', self.articles[:1], post='yes')
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(Tag.objects.get(pk=self.tag.pk).article_count, 2)
+
+    def test_actions_keep_derived_data_in_sync(self):
+        cache.clear()
+        rebuild_related()
+        first, second, third = self.articles
+        second_url = reverse('article_view', kwargs={'pk': second.pk})
+        first_url = reverse('article_view', kwargs={'pk': first.pk})
+        self.assertContains(self.client.get(second_url), 'Article 0')
+        comments = [comment.text for comment in self.client.get(first_url).context['comments']]
+
+        def found(query):
+            return set(get_search_backend().search(Article.objects.all(), query).values_list('pk', flat=True))
+        self.assertEqual(found('python'), {first.pk, second.pk, third.pk})
+
+        self.client.post(reverse('admin:webapp_comment_changelist'),
+                         {'action': 'delete_comments', 'post': 'yes',
+                          '_selected_action': list(first.comments.values_list('pk', flat=True))})
+        response = self.client.get(first_url)
+        for text in comments:
+            self.assertNotContains(response, text)
+        self.assertEqual(Article.objects.get(pk=first.pk).comment_count, 0)
+
+        self.run_action('remove_tag', [third], tag=self.tag.pk)
+        self.assertEqual(found('python'), {first.pk, second.pk})
+        self.run_action('delete_articles', [first], post='yes')
+        self.assertEqual(found('python'), {second.pk})
+        self.assertNotContains(self.client.get(second_url), 'Article 0')
+        self.assertEqual(Tag.objects.get(pk=self.tag.pk).article_count, 1)
+        self.assertEqual(ArticleMonth.objects.aggregate(total=Sum('article_count'))['total'], 2)
+        self.assertEqual(rebuild_related(), 0)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT rowid FROM {}'.format(FTS_TABLE))
+            self.assertEqual({row[0] for row in cursor.fetchall()}, {second.pk, third.pk})
+
+    def test_comment_actions_and_inline(self):
+        url = reverse('admin:webapp_article_change', args=[self.articles[0].pk])
+        response = self.client.get(url, {'comments_page': 3})
+        self.assertEqual(len(response.context['inline_admin_formsets'][1].formset.forms), 5)
+        self.assertContains(response, 'Comments page 3 of 3')
+        comments = Comment.objects.order_by('pk')[:10]
+        self.client.post(reverse('admin:webapp_comment_changelist'),
+                         {'action': 'delete_comments', '_selected_action': [comment.pk for comment in comments],
+                          'post': 'yes'})
+        self.articles[0].refresh_from_db()
+        self.assertEqual(self.articles[0].comment_count, 35)
+
+    def test_inline_edits_survive_shifted_pages(self):
+        url = reverse('admin:webapp_article_change', args=[self.articles[0].pk])
+        response = self.client.get(url, {'comments_page': 2})
+        data = {}
+        forms = [response.context['adminform'].form]
+        for inline in response.context['inline_admin_formsets']:
+            forms += [inline.formset.management_form] + inline.formset.forms
+        for form in forms:
+            data.update({form.add_prefix(name): form[name].value() for name in form.fields
+                         if form[name].value() is not None})
+        # The last row of the page moves to the next page once a newer comment is added.
+        last = response.context['inline_admin_formsets'][1].formset.forms[-1]
+        edited = last.instance
+        data[last.add_prefix('text')] = 'Edited'
+        Comment.objects.create(article=self.articles[0], text='Newer')
+        response = self.client.post(url + '?comments_page=2', data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Comment.objects.get(pk=edited.pk).text, 'Edited')
+        self.assertEqual(Comment.objects.filter(text='Edited').count(), 1)
+
+
+class ProfilingMiddlewareTest(TestCase):
+    def setUp(self):
+        stats.reset()
+
+    def test_server_timing_and_stats(self):
+        article = Article.objects.create(title='Article', text='Text')
+        with self.settings(PROFILING=dict(settings.PROFILING, ENABLED=True)):
+            client = Client()
+            client.force_login(User.objects.create_user('staff', is_staff=True))
+            response = client.get(reverse('article_view', kwargs={'pk': article.pk}))
+            self.assertIn('sql;dur=', response['Server-Timing'])
+            views = client.get(settings.PROFILING['STATS_PATH'], {'reset': 1}).json()['views']
+            self.assertEqual(views, {})
+            client.get(reverse('article_view', kwargs={'pk': article.pk}))
+            views = client.get(settings.PROFILING['STATS_PATH']).json()['views']
+            self.assertEqual(views['article_view']['requests'], 1)
+            self.assertGreater(views['article_view']['template_ms'], 0)
+
+    def test_hidden_from_visitors(self):
+        with self.settings(PROFILING=dict(settings.PROFILING, ENABLED=True)):
+            client = Client()
+            response = client.get(reverse('index'))
+            self.assertNotIn('Server-Timing', response)
+            self.assertEqual(client.get(settings.PROFILING['STATS_PATH'], {'reset': 1}).status_code, 404)
+            with self.settings(INTERNAL_IPS=['127.0.0.1']):
+                views = client.get(settings.PROFILING['STATS_PATH']).json()['views']
+            self.assertEqual(views['index']['requests'], 1)
+
+
+class ApiConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.article = Article.objects.create(title='Article', text='Text')
+        self.url = reverse('api_article_detail', kwargs={'pk': self.article.pk})
+
+    def test_not_modified_until_comment_added(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Comment.objects.create(article=self.article, text='New')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_comment_edits_move_last_modified(self):
+        comment = Comment.objects.create(article=self.article, text='First')
+        url = reverse('api_article_comments', kwargs={'pk': self.article.pk})
+        cache.set(article_changed_key(self.article.pk), timezone.now() - timedelta(hours=1), None)
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        comment.text = 'Edited'
+        comment.save()
+        self.assertContains(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified), 'Edited')
+
+    def test_list_not_modified(self):
+        url = reverse('api_article_list')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Article.objects.create(title='Other', text='Text')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class FeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.article = Article.objects.create(title='Feed article', text='Text', author=Author.objects.create(name='Anna'))
+        Comment.objects.create(article=self.article, text='First comment')
+
+    def test_article_feeds(self):
+        for name in ('article_feed_rss', 'article_feed_atom'):
+            response = self.client.get(reverse(name))
+            self.assertContains(response, 'Feed article')
+            self.assertContains(response, 'Anna')
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(reverse(name), HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+                self.assertContains(self.client.get(reverse(name)), 'Feed article')
+        Article.objects.create(title='Newer article', text='Text')
+        self.assertContains(self.client.get(reverse('article_feed_rss')), 'Newer article')
+
+    def test_comment_feed(self):
+        url = reverse('article_comments_feed_atom', kwargs={'pk': self.article.pk})
+        response = self.client.get(url)
+        self.assertContains(response, 'First comment')
+        self.assertContains(response, '#comment-')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        Comment.objects.create(article=self.article, text='Second comment')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertContains(response, 'Second comment')
+        response = self.client.get(reverse('article_comments_feed_rss', kwargs={'pk': 0}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_sitemap(self):
+        articles_url = reverse('sitemap_section', kwargs={'section': 'articles'})
+        self.assertContains(self.client.get(reverse('sitemap')), articles_url)
+        response = self.client.get(articles_url)
+        self.assertContains(response, reverse('article_view', kwargs={'pk': self.article.pk}))
+        self.assertContains(self.client.get(reverse('sitemap_section', kwargs={'section': 'pages'})),
+                            reverse('archive_index'))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(articles_url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        url = reverse('article_view', kwargs={'pk': self.article.pk})
+        self.article.delete()
+        self.assertNotContains(self.client.get(articles_url), url + '<')
+
+    @override_settings(ALLOWED_HOSTS=['testserver', 'mirror.example.com'])
+    def test_cached_per_host(self):
+        self.assertContains(self.client.get(reverse('article_feed_rss')), 'http://testserver/')
+        response = self.client.get(reverse('article_feed_rss'), HTTP_HOST='mirror.example.com', secure=True)
+        self.assertContains(response, 'https://mirror.example.com/')
+        self.assertNotContains(response, 'testserver')
@@ -0,0 +1,227 @@
+import csv
+import json
+import os
+import time
+from collections import OrderedDict
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from webapp.archive import rebuild_archive
+from webapp.cache import bump_article_versions
+from webapp.models import Article, ArticleTag, Author, Category, Comment, Tag, UNKNOWN_AUTHOR,\
+                          make_excerpt, normalize_author
+from webapp.related import rebuild_related
+from webapp.search import get_search_backend
+from webapp.seeding import explicit_timestamps
+
+
+# Exported columns per model as (column, lookup). Categories and tags are referenced by name,
+# articles and comments keep their ids so comments can point at their article.
+COLUMNS = OrderedDict([
+    ('category', [('id', 'id'), ('name', 'name')]),
+    ('tag', [('id', 'id'), ('name', 'name'), ('created_at', 'created_at')]),
+    ('article', [('id', 'id'), ('title', 'title'), ('text', 'text'), ('author', 'author__name'),
+                 ('category', 'category__name'), ('created_at', 'created_at'), ('updated_at', 'updated_at')]),
+    ('articletag', [('article', 'article_id'), ('tag', 'tag__name')]),
+    ('comment', [('id', 'id'), ('article', 'article_id'), ('text', 'text'), ('author', 'author__name'),
+                 ('created_at', 'created_at'), ('updated_at', 'updated_at')]),
+])
+
+MODELS = {
+    'category': Category,
+    'tag': Tag,
+    'article': Article,
+    'articletag': ArticleTag,
+    'comment': Comment,
+}
+
+DEPENDENCIES = {
+    'articletag': ['article'],
+    'comment': ['article'],
+}
+
+
+def pks_by_name(model):
+    """Maps each name to the oldest row that has it; category and tag names are not unique."""
+    pks = {}
+    for name, pk in model.objects.order_by('pk').values_list('name', 'pk'):
+        pks.setdefault(name, pk)
+    return pks
+
+
+def export_rows(name, chunk_size=2000):
+    columns = COLUMNS[name]
+    queryset = MODELS[name].objects.order_by('pk').values_list(*[lookup for _, lookup in columns])
+    for values in queryset.iterator(chunk_size=chunk_size):
+        row = {}
+        for (column, _), value in zip(columns, values):
+            row[column] = value.isoformat() if hasattr(value, 'isoformat') else value
+        yield row
+
+
+class NdjsonWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, name, row):
+        self.stream.write(json.dumps(dict(row, model=name), ensure_ascii=False))
+        self.stream.write('\n')
+
+    def close(self):
+        self.stream.flush()
+
+
+class CsvWriter:
+    """Writes one <model>.csv file per model into a directory."""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.files = {}
+        self.writers = {}
+
+    def write(self, name, row):
+        if name not in self.writers:
+            self.files[name] = open(os.path.join(self.directory, name + '.csv'), 'w', newline='', encoding='utf-8')
+            self.writers[name] = csv.DictWriter(self.files[name], [column for column, _ in COLUMNS[name]])
+            self.writers[name].writeheader()
+        self.writers[name].writerow(row)
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+
+
+def read_ndjson(stream):
+    for line in stream:
+        if line.strip():
+            row = json.loads(line)
+            yield row.pop('model'), row
+
+
+def read_csv(directory, names):
+    for name in names:
+        path = os.path.join(directory, name + '.csv')
+        if not os.path.exists(path):
+            continue
+        with open(path, newline='', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                yield name, {column: value if value != '' else None for column, value in row.items()}
+
+
+class Importer:
+    """Buffers incoming rows per model and writes them with bulk_create(), one transaction per batch."""
+
+    def __init__(self, batch_size=500, ignore_conflicts=False):
+        self.batch_size = batch_size
+        self.ignore_conflicts = ignore_conflicts
+        self.authors = dict(Author.objects.values_list('name', 'pk'))
+        self.categories = pks_by_name(Category)
+        self.tags = pks_by_name(Tag)
+        self.pending = {name: [] for name in COLUMNS}
+        self.counts = {name: 0 for name in COLUMNS}
+        self.seconds = {name: 0.0 for name in COLUMNS}
+        self.reindex = False
+
+    def add(self, name, row):
+        if name not in COLUMNS:
+            raise ValueError('Unknown model "{}"'.format(name))
+        obj = getattr(self, 'build_' + name)(row)
+        if obj is None:
+            return
+        self.pending[name].append(obj)
+        if len(self.pending[name]) >= self.batch_size:
+            self.flush(name)
+
+    def resolve_author(self, name):
+        name = normalize_author(name)
+        if not name:
+            return None
+        if name not in self.authors:
+            self.authors[name] = Author.objects.get_or_create(name=name)[0].pk
+        return self.authors[name]
+
+    def resolve_category(self, name):
+        if not name:
+            return None
+        if name not in self.categories:
+            self.categories[name] = Category.objects.create(name=name).pk
+            self.counts['category'] += 1
+        return self.categories[name]
+
+    def resolve_tag(self, name, created_at=None):
+        if name not in self.tags:
+            self.tags[name] = Tag.objects.create(name=name, created_at=created_at or timezone.now()).pk
+            self.counts['tag'] += 1
+        return self.tags[name]
+
+    def timestamp(self, value):
+        return parse_datetime(value) if value else timezone.now()
+
+    def build_category(self, row):
+        self.resolve_category(row['name'])
+
+    def build_tag(self, row):
+        with explicit_timestamps(Tag):
+            self.resolve_tag(row['name'], self.timestamp(row.get('created_at')))
+
+    def build_article(self, row):
+        return Article(
+            pk=int(row['id']), title=row['title'], text=row['text'], excerpt=make_excerpt(row['text']),
+            author_id=self.resolve_author(row['author']) or self.resolve_author(UNKNOWN_AUTHOR),
+            category_id=self.resolve_category(row.get('category')),
+            created_at=self.timestamp(row.get('created_at')), updated_at=self.timestamp(row.get('updated_at')),
+        )
+
+    def build_articletag(self, row):
+        return ArticleTag(article_id=int(row['article']), tag_id=self.resolve_tag(row['tag']))
+
+    def build_comment(self, row):
+        return Comment(
+            pk=int(row['id']), article_id=int(row['article']), text=row['text'],
+            author_id=self.resolve_author(row.get('author')),
+            created_at=self.timestamp(row.get('created_at')), updated_at=self.timestamp(row.get('updated_at')),
+        )
+
+    def flush(self, name):
+        for dependency in DEPENDENCIES.get(name, []):
+            self.flush(dependency)
+        objects = self.pending[name]
+        if not objects:
+            return
+        self.pending[name] = []
+        started = time.perf_counter()
+        model = MODELS[name]
+        ignore_conflicts = self.ignore_conflicts or model is ArticleTag
+        with transaction.atomic(), explicit_timestamps(model):
+            if ignore_conflicts:
+                # bulk_create() can't tell which rows it skipped, so count the batch's rows around it.
+                rows = self.batch_rows(model, objects)
+                existing = rows.count()
+            model.objects.bulk_create(objects, ignore_conflicts=ignore_conflicts)
+            inserted = rows.count() - existing if ignore_conflicts else len(objects)
+            if model is Comment:
+                article_pks = {comment.article_id for comment in objects}
+                Article.objects.filter(pk__in=article_pks).refresh_comment_stats()
+                bump_article_versions(article_pks)
+            elif model is ArticleTag:
+                bump_article_versions({article_tag.article_id for article_tag in objects})
+                Tag.objects.filter(pk__in={article_tag.tag_id for article_tag in objects}).refresh_article_counts()
+        self.seconds[name] += time.perf_counter() - started
+        self.counts[name] += inserted
+        self.reindex = self.reindex or model in (Article, ArticleTag)
+
+    def batch_rows(self, model, objects):
+        if model is ArticleTag:
+            return ArticleTag.objects.filter(article_id__in={article_tag.article_id for article_tag in objects})
+        return model.objects.filter(pk__in=[obj.pk for obj in objects])
+
+    def finish(self):
+        for name in COLUMNS:
+            self.flush(name)
+        if self.reindex:
+            get_search_backend().rebuild()
+            rebuild_related()
+        if self.counts['article']:
+            rebuild_archive()
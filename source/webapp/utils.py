@@ -0,0 +1,10 @@
+# Batch size of the set-based writes: small enough to stay under SQLite's limit on query
+# parameters, large enough that a few statements cover thousands of rows.
+
+CHUNK_SIZE = 500
+
+
+def chunks(items, size=CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
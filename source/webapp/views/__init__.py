@@ -1,6 +1,17 @@
-from .article_views import  ArticleIndexView, ArticleView, ArticleCreateView, ArticleEditView, ArticleDeleteView
+from .article_views import  ArticleIndexView, DiscussedArticleIndexView, TrendingArticleIndexView, ArticleView, ArticleCreateView, ArticleEditView, ArticleDeleteView
 
 
 from .comment_views import CommentIndexView, CommentCreateView, CommentEditView, CommentDeleteView,\
         CommentForArticleCreateView
 
+
+from .tag_views import TagIndexView, TagArticlesView
+
+from .archive_views import ArchiveIndexView, ArchiveArticlesView
+
+from .author_views import AuthorArticlesView
+
+from .feed_views import LatestArticlesFeed, LatestArticlesAtomFeed, ArticleCommentsFeed, ArticleCommentsAtomFeed,\
+        SitemapIndexView, SitemapView
+
+from .api_views import ArticleListApiView, ArticleDetailApiView, ArticleCommentsApiView, CommentsSinceApiView
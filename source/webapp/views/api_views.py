@@ -0,0 +1,178 @@
+from collections import defaultdict
+
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.shortcuts import reverse
+from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
+from django.views.generic import ListView, View
+from webapp.cache import get_article_changed_at, get_article_version, get_articles_changed_at, latest_comments
+from webapp.models import ANONYMOUS_AUTHOR, Article, ArticleTag, Comment
+from webapp.pagination import PREVIOUS, CursorPaginationMixin, decode_cursor, encode_cursor
+from webapp.views.article_views import ArticleIndexView
+
+
+ARTICLE_FIELDS = ['id', 'title', 'excerpt', 'author__name', 'category__name', 'created_at', 'updated_at',
+                  'comment_count', 'last_commented_at']
+COMMENT_FIELDS = ['id', 'author__name', 'text', 'created_at', 'updated_at']
+FEED_FIELDS = COMMENT_FIELDS + ['article_id']
+
+
+def article_list_etag(request, *args, **kwargs):
+    return quote_etag('{}:{}'.format(get_articles_changed_at().timestamp(), request.GET.urlencode()))
+
+
+def article_list_last_modified(request, *args, **kwargs):
+    return get_articles_changed_at()
+
+
+def article_state(request, pk):
+    if not hasattr(request, '_article_state'):
+        request._article_state = Article.objects.filter(pk=pk).values('updated_at').first()
+    if request._article_state is None:
+        raise Http404('No article found matching the query')
+    return request._article_state
+
+
+def article_etag(request, pk, *args, **kwargs):
+    state = article_state(request, pk)
+    return quote_etag('{}:{}:{}:{}'.format(
+        pk, state['updated_at'].timestamp(), get_article_version(pk), request.GET.urlencode()))
+
+
+def article_last_modified(request, pk, *args, **kwargs):
+    # Bumped by comment edits and deletes too, which leave the article's own timestamps alone.
+    article_state(request, pk)
+    return get_article_changed_at(pk)
+
+
+def serialize_authors(objects):
+    for obj in objects:
+        obj['author'] = obj.pop('author__name') or ANONYMOUS_AUTHOR
+    return objects
+
+
+def serialize_articles(articles):
+    tags = defaultdict(list)
+    pairs = ArticleTag.objects.filter(article_id__in=[article['id'] for article in articles])\
+        .order_by('tag__name').values_list('article_id', 'tag__name')
+    for article_id, name in pairs:
+        tags[article_id].append(name)
+    serialize_authors(articles)
+    for article in articles:
+        article['category'] = article.pop('category__name')
+        article['tags'] = tags[article['id']]
+        article['url'] = reverse('api_article_detail', kwargs={'pk': article['id']})
+    return articles
+
+
+class JsonPageMixin:
+    def page_url(self, **params):
+        query = self.request.GET.copy()
+        for key in ('page', self.cursor_param):
+            query.pop(key, None)
+        query.update(params)
+        return '{}?{}'.format(self.request.path, query.urlencode())
+
+    def page_links(self, page):
+        links = {'next': None, 'previous': None}
+        if getattr(page, 'is_cursor', False):
+            if page.has_next():
+                links['next'] = self.page_url(**{self.cursor_param: page.next_cursor})
+            if page.has_previous():
+                links['previous'] = self.page_url(**{self.cursor_param: page.previous_cursor})
+        else:
+            if page.has_next():
+                links['next'] = self.page_url(page=page.next_page_number())
+            if page.has_previous():
+                links['previous'] = self.page_url(page=page.previous_page_number())
+            links['count'] = page.paginator.count
+        return links
+
+    def render_to_response(self, context, **response_kwargs):
+        results = self.serialize(list(context['object_list']))
+        data = {'results': results}
+        if context['page_obj'] is not None:
+            data.update(self.page_links(context['page_obj']))
+        return JsonResponse(data, **response_kwargs)
+
+    def serialize(self, objects):
+        return objects
+
+
+@method_decorator(condition(etag_func=article_list_etag, last_modified_func=article_list_last_modified),
+                  name='get')
+class ArticleListApiView(JsonPageMixin, ArticleIndexView):
+    paginate_by = 20
+
+    def get_queryset(self):
+        return super().get_queryset().prefetch_related(None)\
+            .values(*ARTICLE_FIELDS)
+
+    def serialize(self, objects):
+        return serialize_articles(objects)
+
+
+@method_decorator(condition(etag_func=article_etag, last_modified_func=article_last_modified), name='get')
+class ArticleDetailApiView(View):
+    def get(self, request, *args, **kwargs):
+        article = Article.objects.filter(pk=kwargs['pk'])\
+            .values(*ARTICLE_FIELDS, 'text').first()
+        if article is None:
+            raise Http404('No article found matching the query')
+        serialize_articles([article])
+        article['comments_url'] = reverse('api_article_comments', kwargs={'pk': article['id']})
+        return JsonResponse(article)
+
+
+@method_decorator(condition(etag_func=article_etag, last_modified_func=article_last_modified), name='get')
+class ArticleCommentsApiView(JsonPageMixin, CursorPaginationMixin, ListView):
+    paginate_by = 20
+
+    def get_queryset(self):
+        return Comment.objects.filter(article_id=self.kwargs['pk']).order_by('-created_at', '-id')\
+            .values(*COMMENT_FIELDS)
+
+    def serialize(self, objects):
+        return serialize_authors(objects)
+
+
+def load_latest_comments(size):
+    return serialize_authors(list(Comment.objects.order_by('-created_at', '-id').values(*FEED_FIELDS)[:size]))
+
+
+class CommentsSinceApiView(View):
+    """Comments newer than ?cursor=, oldest first, for clients polling the global comment feed.
+
+    Without a cursor it returns the newest comments. The returned cursor points at the newest
+    comment sent and is what the client passes on its next poll.
+    """
+    default_limit = 50
+
+    def get(self, request, *args, **kwargs):
+        token = request.GET.get('cursor')
+        position = decode_cursor(token)
+        if token and position is None:
+            return JsonResponse({'error': 'Invalid cursor'}, status=400)
+        if position is not None:
+            position = position[:2]
+        try:
+            limit = min(int(request.GET.get('limit', self.default_limit)), latest_comments.size)
+        except ValueError:
+            limit = self.default_limit
+        limit = max(limit, 1)
+
+        comments = latest_comments.since(load_latest_comments, position, limit)
+        if comments is None:
+            created_at, pk = position
+            comments = serialize_authors(list(
+                Comment.objects.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+                .order_by('created_at', 'id').values(*FEED_FIELDS)[:limit]))
+        comments = [dict(comment, article_url=reverse('api_article_detail', kwargs={'pk': comment['article_id']}))
+                    for comment in comments]
+        return JsonResponse({
+            'results': comments,
+            'cursor': encode_cursor(comments[-1], PREVIOUS) if comments else token,
+            'has_more': len(comments) == limit,
+        })
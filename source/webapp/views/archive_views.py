@@ -0,0 +1,49 @@
+from collections import OrderedDict
+from datetime import MAXYEAR, MINYEAR, date
+
+from django.http import Http404
+from django.views.generic import TemplateView
+from webapp.archive import get_archive_months, month_bounds, year_bounds
+from webapp.views.article_views import ArticleIndexView
+
+
+class ArchiveIndexView(TemplateView):
+    template_name = 'archive/index.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        years = OrderedDict()
+        for month, article_count in get_archive_months():
+            years.setdefault(month.year, []).append((month, article_count))
+        context['years'] = years
+        return context
+
+
+class ArchiveArticlesView(ArticleIndexView):
+    """Articles created in one month, or in one year when the URL has no month."""
+
+    def get(self, request, *args, **kwargs):
+        # Bounds run to the first day of the following year, so the last representable year is out too.
+        self.year = kwargs['year']
+        if not MINYEAR < self.year < MAXYEAR:
+            raise Http404('Invalid year')
+        try:
+            self.month = date(self.year, kwargs['month'], 1) if 'month' in kwargs else None
+        except ValueError:
+            raise Http404('Invalid month')
+        self.bounds = month_bounds(self.month) if self.month else year_bounds(self.year)
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        start, end = self.bounds
+        return super().get_queryset().filter(created_at__gte=start, created_at__lt=end)
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        context = super().get_context_data(object_list=object_list, **kwargs)
+        context['archive_year'] = self.year
+        context['archive_month'] = self.month
+        if self.month:
+            months = [month for month, _ in get_archive_months()]
+            context['newer_month'] = min((month for month in months if month > self.month), default=None)
+            context['older_month'] = max((month for month in months if month < self.month), default=None)
+        return context
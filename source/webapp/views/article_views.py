@@ -1,20 +1,34 @@
-from django.core.paginator import Paginator
-from django.db.models import Q
+import math
+
+from django.db.models import prefetch_related_objects
 from django.shortcuts import get_object_or_404, redirect, reverse
+from django.template.loader import render_to_string
 from django.urls import reverse_lazy
 from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
-from webapp.models import Article, Comment
+from webapp.archive import get_archive_months
+from webapp.buffers import flush_pending_comments, record_article_view
+from webapp.cache import get_article_page, set_article_page
+from webapp.concurrency import ConcurrentPaginator, run_concurrently
+from webapp.models import Article, Comment, RelatedArticle
+from webapp.views.base_views import ChangedFieldsUpdateMixin
 from webapp.forms import ArticleForm, ArticleCommentForm, SimpleSearchForm
+from webapp.middleware import template_timer
+from webapp.pagination import CursorPaginationMixin, decode_cursor
+from webapp.routers import ReadOnlyDatabaseMixin
+from webapp.search import get_search_backend
 
 
-class ArticleIndexView(ListView):
+class ArticleIndexView(ReadOnlyDatabaseMixin, CursorPaginationMixin, ListView):
     template_name = 'article/index.html'
     context_object_name = 'articles'
     model = Article
     ordering = ['-created_at']
     paginate_by = 4
     paginate_orphans = 1
+    paginator_class = ConcurrentPaginator
+    archive_months = 12
 
     def get(self, request, *args, **kwargs):
         self.form = self.get_search_form()
@@ -26,43 +40,117 @@ class ArticleIndexView(ListView):
         if self.search_query:
             context['query'] = urlencode({'search': self.search_query})
         context['form'] = self.form
+        context['archive_months'] = get_archive_months()[:self.archive_months]
         return context
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('author', 'category').prefetch_related('tags').defer('text')
         if self.search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=self.search_query)
-                | Q(author__icontains=self.search_query)
-            )
+            queryset = get_search_backend().search(queryset, self.search_query)
         return queryset
 
     def get_search_form(self):
         return SimpleSearchForm(self.request.GET)
 
+    def use_cursor_pagination(self):
+        # Cursors walk created_at, which would throw away the search backend's ranking.
+        return not self.search_query and super().use_cursor_pagination()
+
     def get_search_query(self):
         if self.form.is_valid():
             return self.form.cleaned_data['search']
         return None
 
 
+class DiscussedArticleIndexView(ArticleIndexView):
+    ordering = ['-comment_count', '-last_commented_at']
+
+    def use_cursor_pagination(self):
+        return False
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.search_query:
+            queryset = queryset.order_by(*self.ordering)
+        return queryset
+
+
+class TrendingArticleIndexView(ArticleIndexView):
+    ordering = ['-trending_score', '-id']
 
-class ArticleView(DetailView):
+    def use_cursor_pagination(self):
+        return False
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(view_count__gt=0)
+        if self.search_query:
+            queryset = queryset.order_by(*self.ordering)
+        return queryset
+
+
+class ArticleView(ReadOnlyDatabaseMixin, CursorPaginationMixin, DetailView):
     template_name = 'article/article.html'
+    body_template_name = 'article/article_body.html'
+    comments_per_page = 3
     model = Article
     context_object_name = 'article'
 
+    def get(self, request, *args, **kwargs):
+        flush_pending_comments(request, kwargs.get('pk'))
+        response = super().get(request, *args, **kwargs)
+        record_article_view(self.object.pk)
+        return response
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('author', 'category')
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = ArticleCommentForm()
-        comments = context['article'].comments.order_by('-created_at')
-        self.paginate_comments_to_context(comments, context)
+        context['article_body'] = self.get_article_body(context)
         return context
 
+    def get_article_body(self, context):
+        page = self.get_comment_page_key()
+        body = get_article_page(self.object, page)
+        if body is None:
+            comments = self.object.comments.select_related('author').order_by('-created_at')
+            run_concurrently(
+                lambda: self.paginate_comments_to_context(comments, context),
+                lambda: prefetch_related_objects([self.object], 'tags'),
+                lambda: context.update(related_articles=self.get_related_articles()),
+            )
+            with template_timer(self.request):
+                body = render_to_string(self.body_template_name, context, self.request)
+            set_article_page(self.object, page, body)
+        return mark_safe(body)
+
+    def get_related_articles(self):
+        return list(RelatedArticle.objects.filter(article=self.object).order_by('-score', '-related_id')
+                    .select_related('related').only('related__title'))
+
+    def get_comment_page_key(self):
+        # Only pages that can exist get a key, so junk parameters can't fill the cache.
+        if self.use_cursor_pagination():
+            cursor = self.request.GET.get(self.cursor_param, '')
+            return 'cursor:{}'.format(cursor if decode_cursor(cursor) else '')
+        return 'page:{}'.format(self.get_comment_page_number())
+
+    def get_comment_page_number(self):
+        """The page Paginator.get_page() shows for ?page=, counted from the stored comment_count."""
+        num_pages = max(1, math.ceil(self.object.comment_count / self.comments_per_page))
+        try:
+            number = int(self.request.GET.get('page', 1))
+        except ValueError:
+            return 1
+        return number if 1 <= number <= num_pages else num_pages
+
     def paginate_comments_to_context(self, comments, context):
-        paginator = Paginator(comments, 3, 0)
-        page_number = self.request.GET.get('page', 1)
-        page = paginator.get_page(page_number)
+        if self.use_cursor_pagination():
+            paginator, page = self.get_cursor_page(comments, self.comments_per_page)
+        else:
+            paginator = ConcurrentPaginator(comments, self.comments_per_page, 0)
+            page = paginator.get_page(self.get_comment_page_number())
         context['paginator'] = paginator
         context['page_obj'] = page
         context['comments'] = page.object_list
@@ -88,7 +176,7 @@ class ArticleCreateView(CreateView):
         return reverse('article_view', kwargs={'pk': self.object.pk})
 
 
-class ArticleEditView(UpdateView):
+class ArticleEditView(ChangedFieldsUpdateMixin, UpdateView):
     model = Article
     template_name = 'article/update.html'
     form_class = ArticleForm
@@ -0,0 +1,17 @@
+from django.shortcuts import get_object_or_404
+from webapp.models import Author
+from webapp.views.article_views import ArticleIndexView
+
+
+class AuthorArticlesView(ArticleIndexView):
+    def get(self, request, *args, **kwargs):
+        self.author = get_object_or_404(Author, pk=kwargs.get('pk'))
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return super().get_queryset().filter(author=self.author)
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        context = super().get_context_data(object_list=object_list, **kwargs)
+        context['author'] = self.author
+        return context
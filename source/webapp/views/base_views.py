@@ -1,5 +1,52 @@
+from django.db import transaction
+from django.http import HttpResponseRedirect
 from django.views.generic import View, TemplateView
 from django.shortcuts import render, redirect, get_object_or_404
+from django.utils import timezone
+
+
+def changed_model_fields(form, instance):
+    """Names of the concrete and many-to-many model fields whose values the form changed."""
+    opts = instance._meta
+    concrete = {field.name for field in opts.concrete_fields}
+    many_to_many = {field.name for field in opts.many_to_many}
+    changed = set(form.changed_data)
+    return sorted(changed & concrete), sorted(changed & many_to_many)
+
+
+class ChangedFieldsUpdateMixin:
+    """Saves only the fields a VersionedModelForm changed, and only if nobody saved the object since the form
+    was rendered: the updated_at the form was built from is claimed with a conditional UPDATE, so stale
+    edits are rejected without locking the row.
+    """
+    stale_message = 'This was changed by someone else while you were editing it. Reload the page to see their changes.'
+
+    def form_valid(self, form):
+        fields, many_to_many = changed_model_fields(form, self.object)
+        if not fields and not many_to_many:
+            return HttpResponseRedirect(self.get_success_url())
+        self.object = form.save(commit=False)
+        with transaction.atomic():
+            claimed = self.claim(form.cleaned_data['version'])
+            if claimed is None:
+                return self.form_stale(form)
+            # The claim already wrote updated_at; leaving it out of update_fields keeps auto_now from writing it again.
+            self.object.updated_at = claimed
+            if fields:
+                self.object.save(update_fields=fields)
+            if many_to_many:
+                form.save_m2m()
+        return HttpResponseRedirect(self.get_success_url())
+
+    def claim(self, version):
+        """Moves updated_at from version to now and returns now, or returns None if the object has moved on."""
+        now = timezone.now()
+        queryset = type(self.object)._default_manager.filter(pk=self.object.pk, updated_at=version)
+        return now if queryset.update(updated_at=now) == 1 else None
+
+    def form_stale(self, form):
+        form.add_error(None, self.stale_message)
+        return self.render_to_response(self.get_context_data(form=form), status=409)
 
 
 class ListView(TemplateView):
@@ -75,7 +122,6 @@ class UpdateView(View):
         initial = {}
         for field in model_fields:
             initial[field] = getattr(self.object, field)
-        print(initial)
         return initial
 
     def post(self, request, *args, **kwargs):
@@ -87,9 +133,13 @@ class UpdateView(View):
 
     def form_valid(self, form):
         self.object = self.get_object()
+        changed = []
         for field, value in form.cleaned_data.items():
-            setattr(self.object, field, value)
-        self.object.save()
+            if getattr(self.object, field) != value:
+                setattr(self.object, field, value)
+                changed.append(field)
+        if changed:
+            self.object.save(update_fields=changed)
         return redirect(self.get_redirect_url())
 
     def form_invalid(self, form):
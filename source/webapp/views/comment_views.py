@@ -1,16 +1,26 @@
+from django.http import Http404
 from django.shortcuts import reverse, get_object_or_404, redirect
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from webapp.models import Comment, Article
+from webapp.buffers import buffer_comment, get_comment_buffer
+from webapp.concurrency import ConcurrentPaginator
+from webapp.views.base_views import ChangedFieldsUpdateMixin
 from webapp.forms import CommentForm, ArticleCommentForm
+from webapp.pagination import CursorPaginationMixin
+from webapp.routers import ReadOnlyDatabaseMixin
 
 
-class CommentIndexView(ListView):
+class CommentIndexView(ReadOnlyDatabaseMixin, CursorPaginationMixin, ListView):
     template_name = 'comments/index.html'
     context_object_name = 'comments'
     model = Comment
     ordering = ['-created_at']
     paginate_by = 6
     paginate_orphans = 1
+    paginator_class = ConcurrentPaginator
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('article', 'author')
 
 
 class CommentForArticleCreateView(CreateView):
@@ -19,8 +29,17 @@ class CommentForArticleCreateView(CreateView):
 
     def form_valid(self, form):
         article_pk = self.kwargs.get('pk')
-        article = get_object_or_404(Article, pk=article_pk)
-        article.comments.create(**form.cleaned_data)
+        if get_comment_buffer() is None:
+            article = get_object_or_404(Article, pk=article_pk)
+            comment = form.save(commit=False)
+            comment.article = article
+            comment.save()
+        else:
+            if not Article.objects.filter(pk=article_pk).exists():
+                raise Http404('No article found matching the query')
+            comment = form.save(commit=False)
+            comment.article_id = article_pk
+            buffer_comment(self.request, comment)
         return redirect('article_view', pk=article_pk)
 
 
@@ -33,14 +52,14 @@ class CommentCreateView(CreateView):
         return reverse('comment_index')
 
 
-class CommentEditView(UpdateView):
+class CommentEditView(ChangedFieldsUpdateMixin, UpdateView):
     model = Comment
     template_name = 'comments/update.html'
     form_class = CommentForm
     context_object_name = 'comment'
 
     def get_success_url(self):
-        return reverse('article_view')
+        return reverse('article_view', kwargs={'pk': self.object.article_id})
 
 
 class CommentDeleteView(DeleteView):
@@ -0,0 +1,148 @@
+from django.conf import settings
+from django.contrib.sitemaps.views import index, sitemap
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.shortcuts import reverse
+from django.utils.decorators import method_decorator
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+from django.views.generic import View
+from webapp.cache import get_article_version, get_articles_changed_at
+from webapp.models import ANONYMOUS_AUTHOR, Article, Comment
+from webapp.sitemaps import SITEMAPS
+from webapp.views.api_views import article_etag, article_last_modified, article_list_etag,\
+                                   article_list_last_modified
+
+
+def response_cache_key(prefix, request, version):
+    """Cache key of a response to request; bodies hold absolute URLs, so scheme and host are part of it."""
+    return '{}:{}://{}{}:{}'.format(prefix, request.scheme, request.get_host(), request.get_full_path(), version)
+
+
+def cached_response(key, build):
+    """Serves the body cached under key, building and storing it first when missing.
+
+    Keys carry the article versions the content depends on, so saves invalidate them.
+    """
+    cached = cache.get(key)
+    if cached is None:
+        response = build()
+        if hasattr(response, 'render'):
+            response.render()
+        if response.status_code != 200:
+            return response
+        cached = (response['Content-Type'], response.content)
+        cache.set(key, cached, settings.FEED_CACHE_TIMEOUT)
+    content_type, content = cached
+    return HttpResponse(content, content_type=content_type)
+
+
+class CachedFeed(Feed):
+    def cache_key(self, request, *args, **kwargs):
+        """Changes with any article; feeds of one article key on its version instead."""
+        return response_cache_key('feed', request, get_articles_changed_at().timestamp())
+
+    def __call__(self, request, *args, **kwargs):
+        return cached_response(self.cache_key(request, *args, **kwargs),
+                               lambda: super(CachedFeed, self).__call__(request, *args, **kwargs))
+
+    def item_pubdate(self, item):
+        return item['created_at']
+
+    def item_updateddate(self, item):
+        return item['updated_at']
+
+    def item_author_name(self, item):
+        return item['author__name']
+
+
+@method_decorator(condition(etag_func=article_list_etag, last_modified_func=article_list_last_modified),
+                  name='__call__')
+class LatestArticlesFeed(CachedFeed):
+    title = 'My Blog'
+    description = 'Latest articles'
+
+    def link(self):
+        return reverse('index')
+
+    def items(self):
+        return Article.objects.order_by('-created_at', '-id')\
+            .values('id', 'title', 'excerpt', 'author__name', 'category__name', 'created_at', 'updated_at')\
+            [:settings.FEED_SIZE]
+
+    def item_title(self, item):
+        return item['title']
+
+    def item_description(self, item):
+        return item['excerpt']
+
+    def item_link(self, item):
+        return reverse('article_view', kwargs={'pk': item['id']})
+
+    def item_categories(self, item):
+        return [item['category__name']] if item['category__name'] else []
+
+
+class LatestArticlesAtomFeed(LatestArticlesFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestArticlesFeed.description
+
+
+@method_decorator(condition(etag_func=article_etag, last_modified_func=article_last_modified), name='__call__')
+class ArticleCommentsFeed(CachedFeed):
+    def cache_key(self, request, pk, *args, **kwargs):
+        return response_cache_key('feed', request, get_article_version(pk))
+
+    def get_object(self, request, pk):
+        article = Article.objects.filter(pk=pk).values('id', 'title').first()
+        if article is None:
+            raise Http404('No article found matching the query')
+        return article
+
+    def title(self, article):
+        return 'Comments on "{}"'.format(article['title'])
+
+    def description(self, article):
+        return self.title(article)
+
+    def link(self, article):
+        return reverse('article_view', kwargs={'pk': article['id']})
+
+    def items(self, article):
+        return Comment.objects.filter(article_id=article['id']).order_by('-created_at', '-id')\
+            .values('id', 'article_id', 'text', 'author__name', 'created_at', 'updated_at')[:settings.FEED_SIZE]
+
+    def item_title(self, item):
+        return '{} commented'.format(item['author__name'] or ANONYMOUS_AUTHOR)
+
+    def item_description(self, item):
+        return item['text']
+
+    def item_link(self, item):
+        return '{}#comment-{}'.format(reverse('article_view', kwargs={'pk': item['article_id']}), item['id'])
+
+
+class ArticleCommentsAtomFeed(ArticleCommentsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, article):
+        return self.title(article)
+
+
+@method_decorator(condition(etag_func=article_list_etag, last_modified_func=article_list_last_modified),
+                  name='get')
+class SitemapIndexView(View):
+    """Lists every page of every section, so sections past Sitemap.limit URLs are still reachable."""
+
+    def get(self, request, *args, **kwargs):
+        key = response_cache_key('sitemap', request, get_articles_changed_at().timestamp())
+        return cached_response(key, lambda: index(request, SITEMAPS, sitemap_url_name='sitemap_section'))
+
+
+@method_decorator(condition(etag_func=article_list_etag, last_modified_func=article_list_last_modified),
+                  name='get')
+class SitemapView(View):
+    def get(self, request, section, *args, **kwargs):
+        key = response_cache_key('sitemap', request, get_articles_changed_at().timestamp())
+        return cached_response(key, lambda: sitemap(request, SITEMAPS, section=section))
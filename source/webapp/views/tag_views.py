@@ -0,0 +1,40 @@
+import math
+
+from django.shortcuts import get_object_or_404
+from django.views.generic import ListView
+from webapp.models import Tag
+from webapp.views.article_views import ArticleIndexView
+
+
+class TagIndexView(ListView):
+    template_name = 'tags/index.html'
+    context_object_name = 'tags'
+    cloud_size = 100
+    weights = 5
+
+    def get_queryset(self):
+        return Tag.objects.filter(article_count__gt=0).order_by('-article_count', 'name')[:self.cloud_size]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        tags = list(context['tags'])
+        if tags:
+            top = math.log(tags[0].article_count + 1)
+            for tag in tags:
+                tag.weight = 1 + round((self.weights - 1) * math.log(tag.article_count + 1) / top)
+        context['tags'] = sorted(tags, key=lambda tag: tag.name.lower())
+        return context
+
+
+class TagArticlesView(ArticleIndexView):
+    def get(self, request, *args, **kwargs):
+        self.tag = get_object_or_404(Tag, pk=kwargs.get('pk'))
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return super().get_queryset().filter(article_tags__tag=self.tag)
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        context = super().get_context_data(object_list=object_list, **kwargs)
+        context['tag'] = self.tag
+        return context